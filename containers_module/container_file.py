@@ -2,6 +2,8 @@ class Container:
     """
     Class used for storing a single container.
     """
+    __slots__ = ("cid", "length", "width", "height", "timestamp")
+
     def __init__(self, cid, length, width, height, timestamp):
         """
         Constructor.
@@ -1,4 +1,3 @@
-import numpy as np
 from .shipments_manager_file import ShipmentsManager, Shipment, PlacedContainer, CornerPosition
 
 
@@ -6,9 +5,10 @@ class IOptimizer:
     """
     An abstract optimizer class.
     """
-    def __init__(self):
+    def __init__(self, **args):
         """
         Constructor.
+        :param args: an optional dictionary used for changing default settings
         """
         self.shipments_manager = None
         self.container_height = None
@@ -18,6 +18,27 @@ class IOptimizer:
         self.previous_shipment = None
         self.report_generator = None
 
+        # default settings
+        self.occupancy_map_type = args.get("occupancy_map_type", "dense")      # a name of an occupancy map backend
+        self.placement_strategy = args.get("placement_strategy",               # a way of choosing candidate places
+                                           "free_rectangles" if self.occupancy_map_type == "sparse" else "first_fit")
+        self.rotation = args.get("rotation", False)                            # if containers may be rotated by 90 deg
+
+        if self.placement_strategy not in self.correct_placement_strategies():
+            raise ValueError(f"Unknown placement strategy {self.placement_strategy!r}, "
+                             f"expected one of {self.correct_placement_strategies()}")
+        # "first_fit" builds a dense summed-area table of a level for every probe, what a sparse map is meant to avoid
+        if self.occupancy_map_type == "sparse" and self.placement_strategy == "first_fit":
+            raise ValueError("Sparse occupancy map does not support placement_strategy='first_fit'")
+
+    @staticmethod
+    def correct_placement_strategies():
+        """
+        Return a list of correct names of placement strategies.
+        :return: a list of correct names of placement strategies
+        """
+        return ["first_fit", "free_rectangles", "extreme_points"]
+
     @staticmethod
     def info():
         """
@@ -26,34 +47,105 @@ class IOptimizer:
         """
         return "Abstract optimizer interface"
 
-    @staticmethod
-    def place_container(shipment, container, single_level=None, if_sort_by_width=False):
+    def create_shipment(self, ship):
         """
-        Place container in a first empty place.
+        Create a new empty shipment based on a given ship using settings of the optimizer.
+        :param ship: a ship
+        :return: a new shipment
+        """
+        return Shipment(ship, containers_height=self.container_height, occupancy_map_type=self.occupancy_map_type)
+
+    def place_container(self, shipment, container, single_level=None, if_sort_by_width=False):
+        """
+        Place container in a first empty place. Failures are remembered by the shipment until it is modified
+        (see Shipment.version), so a repeated placement on an unchanged shipment fails without any search.
+        Candidate places depend on the placement strategy of the optimizer:
+            - "first_fit": all feasible positions are computed in one pass over the shipment,
+            - "free_rectangles": only lower corners of maximal empty rectangles which can hold the container are tried,
+            - "extreme_points": only extreme points of placed containers (projected toward the origin) are tried.
+        If rotation is enabled, both orientations of the container are evaluated in the same scan of candidate places:
+        every place is tried in both orientations before the next one, so the earlier place wins (the unrotated
+        orientation on a tie).
         :param shipment: a shipment
         :param container: a container to place
         :param single_level: (int) a level number where to place the container (if None, place wherever)
         :param if_sort_by_width: (bool) if True, sort empty points by width, else sort them by length
         :return: True if successfully placed the container on the ship, else False
         """
-        if single_level is None:
-            empty_points = np.argwhere(shipment.occupancy_map == 0)
-            if if_sort_by_width:
-                empty_points = empty_points[empty_points[:, 2].argsort(kind='mergesort')]
+        if shipment.contains(container):
+            return False
+        rotation = self.rotation and container.length != container.width
+        placement = (self.placement_strategy, container.length, container.width, single_level, if_sort_by_width,
+                     rotation)
+        if shipment.check_failed_placement(placement):
+            return False
+        footprints = [(container.length, container.width, False)]
+        if rotation:
+            footprints.append((container.width, container.length, True))
+        if self.placement_strategy == "free_rectangles":
+            levels = range(shipment.levels_nr) if single_level is None else [single_level]
+            candidates = {}
+            for h in levels:
+                for length, width, rotated in footprints:
+                    for l, w in shipment.get_free_rectangles(h).get_corners(length, width):
+                        candidates.setdefault((h, l, w), []).append(rotated)
+            candidates = [(h, l, w, tuple(x)) for (h, l, w), x in candidates.items()]
+            success = self._place_container_at_candidates(shipment, container, candidates, if_sort_by_width)
+        elif self.placement_strategy == "extreme_points":
+            levels = range(shipment.levels_nr) if single_level is None else [single_level]
+            candidates = []
+            for h in levels:
+                orientations = tuple(rotated for length, width, rotated in footprints
+                                     if shipment.check_if_may_fit(length, width, h))
+                if orientations:
+                    candidates += [(h, l, w, orientations) for l, w in shipment.get_extreme_points(h)]
+            success = self._place_container_at_candidates(shipment, container, candidates, if_sort_by_width)
         else:
-            empty_points = np.argwhere(shipment.occupancy_map[single_level] == 0)
-            if if_sort_by_width:
-                empty_points = empty_points[empty_points[:, 1].argsort(kind='mergesort')]
+            success = self._place_container_first_fit(shipment, container, single_level, if_sort_by_width, rotation)
+        if not success:
+            shipment.add_failed_placement(placement)
+        return success
 
-        for coordinates in empty_points:
-            if single_level is None:
-                h, l, w = coordinates
-            else:
-                h = single_level
-                l, w = coordinates
+    @staticmethod
+    def _place_container_first_fit(shipment, container, single_level=None, if_sort_by_width=False, rotation=False):
+        """
+        Private method.
+        Place container in a first feasible place. Feasible positions are computed in one pass over the shipment,
+        starting where the previous search for the same footprint ended (see Shipment.find_first_placement).
+        :param shipment: a shipment
+        :param container: a container to place
+        :param single_level: (int) a level number where to place the container (if None, place wherever)
+        :param if_sort_by_width: (bool) if True, sort empty points by width, else sort them by length
+        :param rotation: (bool) if True, the container may be rotated by 90 degrees
+        :return: True if successfully placed the container on the ship, else False
+        """
+        position = shipment.find_first_placement(container.length, container.width, single_level, if_sort_by_width,
+                                                 rotation)
+        if position is None:
+            return False
+        return shipment.place(container, *position)
 
-            if shipment.check_and_add(PlacedContainer(container, CornerPosition(length=l, width=w, height_level=h))):
-                return True
+    @staticmethod
+    def _place_container_at_candidates(shipment, container, candidates, if_sort_by_width=False):
+        """
+        Private method.
+        Place container in a first place from a given list of candidates. At every place orientations are tried
+        in the given order.
+        :param shipment: a shipment
+        :param container: a container to place
+        :param candidates: a list of tuples (height level, length, width, orientations), where orientations is
+                           a tuple of bools (True if rotated) which may fit at the place
+        :param if_sort_by_width: (bool) if True, sort candidates by width, else sort them by length
+        :return: True if successfully placed the container on the ship, else False
+        """
+        if if_sort_by_width:
+            candidates = sorted(candidates, key=lambda x: (x[2], x[0], x[1]))
+        else:
+            candidates = sorted(candidates, key=lambda x: (x[0], x[1], x[2]))
+        for h, l, w, orientations in candidates:
+            for rotated in orientations:
+                if shipment.place(container, h, l, w, rotated):
+                    return True
         return False
 
     def optimize(self, ships, containers, timestamp, container_height, previous_shipment):
@@ -0,0 +1,89 @@
+class ContainerPool:
+    """
+    Class used for storing containers in a fixed (priority) order with fast removal.
+    Containers are kept in an array which is never shifted. Removed containers are marked in an alive bitmap and skip
+    pointers lead from every removed position to the next position which may be alive (with path compression),
+    so removing is O(1), checking membership by id is O(1) and iterating skips removed containers.
+    """
+    def __init__(self, containers=()):
+        """
+        Constructor.
+        :param containers: an iterable of containers in a required order
+        """
+        self.containers = list(containers)                                  # array of all containers (also removed)
+        self.alive = bytearray(b"\x01" * len(self.containers))              # bitmap of alive containers
+        self.skip = list(range(len(self.containers) + 1))                   # position -> a position not less than it which may be alive
+        self.positions = {x.cid: i for i, x in enumerate(self.containers)}  # dict of positions of containers (cid -> position)
+        self.alive_nr = len(self.containers)                                # number of alive containers
+
+    def copy(self):
+        """
+        Return a pool with alive containers of the current one.
+        :return: a copy of the pool
+        """
+        return ContainerPool(self)
+
+    def __len__(self):
+        """
+        Get a number of alive containers. Used when call len(pool).
+        :return: a number of alive containers
+        """
+        return self.alive_nr
+
+    def __contains__(self, container):
+        """
+        Check if a given container is alive in the pool. Used when call container in pool.
+        :param container: a container
+        :return: True if the container is alive in the pool, else False
+        """
+        position = self.positions.get(container.cid)
+        return position is not None and self.alive[position] == 1
+
+    def __iter__(self):
+        """
+        Iterate over alive containers in order. Containers removed during iteration are skipped.
+        :return: an iterator of containers
+        """
+        position = self._find(0)
+        while position < len(self.containers):
+            yield self.containers[position]
+            position = self._find(position + 1)
+
+    def __repr__(self):
+        """
+        Create and return a string describing the pool. Used when call print(pool).
+        :return: a string describing the pool
+        """
+        return f"ContainerPool({list(self)})"
+
+    def _find(self, position):
+        """
+        Private method.
+        Find the first alive position not less than a given one and compress skip pointers on the way.
+        :param position: a position
+        :return: the first alive position (a number of all containers if there is no one)
+        """
+        root = position
+        while self.skip[root] != root:
+            root = self.skip[root]
+        while self.skip[position] != root:
+            self.skip[position], position = root, self.skip[position]
+        return root
+
+    def remove(self, container):
+        """
+        Remove a given container from the pool.
+        :param container: a container
+        :return: True if successfully removed, else False
+        """
+        if container not in self:
+            return False
+        position = self.positions[container.cid]
+        self.alive[position] = 0
+        self.skip[position] = position + 1
+        self.alive_nr -= 1
+        return True
+
+
+if __name__ == "__main__":
+    pass
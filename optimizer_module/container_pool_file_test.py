@@ -0,0 +1,39 @@
+from containers_module.container_file import Container
+from optimizer_module.container_pool_file import ContainerPool
+
+
+def test_remove_and_iterate():
+    """ Containers c0..c9 are in a pool. After removing c3, c4, c9 and c0 the pool iterates over the remaining
+        containers in the original order. Removing a removed or an unknown container fails. A copy contains only
+        alive containers and removing from it does not change the original pool. """
+
+    containers = [Container(cid=i, length=1, width=1, height=10, timestamp=0) for i in range(10)]
+    pool = ContainerPool(containers)
+    assert list(pool) == containers
+    for i in [3, 4, 9, 0]:
+        assert pool.remove(containers[i])
+    assert list(pool) == [containers[i] for i in [1, 2, 5, 6, 7, 8]]
+    assert len(pool) == 6
+    assert containers[5] in pool and containers[4] not in pool
+    assert not pool.remove(containers[4])
+    assert not pool.remove(Container(cid=10, length=1, width=1, height=10, timestamp=0))
+
+    pool_copy = pool.copy()
+    pool_copy.remove(containers[1])
+    assert list(pool_copy) == [containers[i] for i in [2, 5, 6, 7, 8]]
+    assert len(pool) == 6
+
+
+def test_remove_during_iteration():
+    """ Containers removed during iteration (the current one and the next ones) are skipped. """
+
+    containers = [Container(cid=i, length=1, width=1, height=10, timestamp=0) for i in range(8)]
+    pool = ContainerPool(containers)
+    visited = []
+    for container in pool:
+        visited.append(container.cid)
+        pool.remove(container)
+        if container.cid + 1 < len(containers):
+            pool.remove(containers[container.cid + 1])
+    assert visited == [0, 2, 4, 6]
+    assert len(pool) == 0 and list(pool) == []
@@ -2,6 +2,8 @@ class CornerPosition:
     """
     Class used for storing information about position of a corner of a container.
     """
+    __slots__ = ("length", "width", "height_level")
+
     def __init__(self, length, width, height_level):
         """
         Constructor
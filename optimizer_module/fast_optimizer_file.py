@@ -10,11 +10,12 @@ class FastOptimizer(IOptimizer):
     """
     A fast optimizer class.
     """
-    def __init__(self):
+    def __init__(self, **args):
         """
         Constructor.
+        :param args: an optional dictionary used for changing default settings
         """
-        super().__init__()
+        super().__init__(**args)
 
     @staticmethod
     def info():
@@ -30,7 +31,7 @@ class FastOptimizer(IOptimizer):
         :return: a new shipment
         """
         ship = random.choice(self.ships)
-        shipment = Shipment(ship, containers_height=self.container_height)
+        shipment = self.create_shipment(ship)
         return shipment
 
     def optimize(self, ships, containers, timestamp, container_height, previous_shipment):
@@ -60,7 +61,7 @@ class FastOptimizer(IOptimizer):
         shipment = self.new_shipment()
         for container in self.containers:
             if use_previous_shipment:
-                if container in self.previous_shipment.get_all_containers():
+                if self.previous_shipment.contains(container):
                     continue
             if_success = self.place_container(shipment, container)
             if not if_success:
@@ -0,0 +1,83 @@
+class FreeRectangles:
+    """
+    Class used for storing maximal empty rectangles of a single level.
+    A rectangle is a tuple (length1, length2, width1, width2) describing [length1, length2) x [width1, width2).
+    Every empty cell is covered by at least one rectangle and no rectangle is contained in another one.
+    """
+    def __init__(self, length, width):
+        """
+        Constructor.
+        :param length: length of the level
+        :param width: width of the level
+        """
+        self.length = length                            # length of the level
+        self.width = width                              # width of the level
+        self.rectangles = [(0, length, 0, width)]       # list of maximal empty rectangles
+
+    def copy(self):
+        """
+        Return a copy of the free rectangles.
+        :return: a copy of the free rectangles
+        """
+        free_rectangles = FreeRectangles(self.length, self.width)
+        free_rectangles.rectangles = self.rectangles.copy()
+        return free_rectangles
+
+    @staticmethod
+    def _contains(outer, inner):
+        """
+        Private method.
+        Check if a rectangle contains another one.
+        :param outer: a rectangle
+        :param inner: a rectangle
+        :return: True if outer contains inner, else False
+        """
+        return outer[0] <= inner[0] and inner[1] <= outer[1] and outer[2] <= inner[2] and inner[3] <= outer[3]
+
+    def occupy(self, length1, length2, width1, width2):
+        """
+        Update rectangles after occupying a given rectangle. Every free rectangle overlapping the occupied one is split
+        into up to 4 maximal parts which do not overlap it, then rectangles contained in others are removed.
+        :param length1: lower bound of the occupied rectangle in the length axis (inclusive)
+        :param length2: upper bound of the occupied rectangle in the length axis (exclusive)
+        :param width1: lower bound of the occupied rectangle in the width axis (inclusive)
+        :param width2: upper bound of the occupied rectangle in the width axis (exclusive)
+        :return:
+        """
+        kept = []
+        split = []
+        for rectangle in self.rectangles:
+            l1, l2, w1, w2 = rectangle
+            if length1 >= l2 or length2 <= l1 or width1 >= w2 or width2 <= w1:
+                kept.append(rectangle)
+                continue
+            if length1 > l1:
+                split.append((l1, length1, w1, w2))
+            if length2 < l2:
+                split.append((length2, l2, w1, w2))
+            if width1 > w1:
+                split.append((l1, l2, w1, width1))
+            if width2 < w2:
+                split.append((l1, l2, width2, w2))
+        # parts of split rectangles can be contained only in kept rectangles or in other parts
+        maximal = []
+        for i, rectangle in enumerate(split):
+            if any(self._contains(x, rectangle) for x in kept):
+                continue
+            if any(self._contains(x, rectangle) and (x != rectangle or j < i) for j, x in enumerate(split) if j != i):
+                continue
+            maximal.append(rectangle)
+        self.rectangles = kept + maximal
+
+    def get_corners(self, length, width):
+        """
+        Get lower corners of rectangles which can hold a container with given dimensions.
+        :param length: a container length
+        :param width: a container width
+        :return: a set of tuples (length, width)
+        """
+        return {(x[0], x[2]) for x in self.rectangles if x[1] - x[0] >= length and x[3] - x[2] >= width}
+
+
+if __name__ == "__main__":
+    pass
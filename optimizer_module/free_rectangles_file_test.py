@@ -0,0 +1,48 @@
+import random
+import numpy as np
+from optimizer_module.free_rectangles_file import FreeRectangles
+
+
+def get_maximal_rectangles(grid):
+    """ Find all maximal empty rectangles of a grid by brute force. """
+    length, width = grid.shape
+    empty = []
+    for l1 in range(length):
+        for l2 in range(l1 + 1, length + 1):
+            for w1 in range(width):
+                for w2 in range(w1 + 1, width + 1):
+                    if not grid[l1:l2, w1:w2].any():
+                        empty.append((l1, l2, w1, w2))
+    return {x for x in empty
+            if not any(y != x and y[0] <= x[0] and x[1] <= y[1] and y[2] <= x[2] and x[3] <= y[3] for y in empty)}
+
+
+def test_occupy():
+    """ We occupy random non-overlapping rectangles of a small grid. After every step free rectangles have to be
+        exactly the set of maximal empty rectangles. """
+
+    random.seed(7)
+    for _ in range(20):
+        grid = np.zeros(shape=(6, 5), dtype=np.int8)
+        free_rectangles = FreeRectangles(length=6, width=5)
+        for _ in range(6):
+            l1, w1 = random.randint(0, 5), random.randint(0, 4)
+            l2, w2 = random.randint(l1 + 1, 6), random.randint(w1 + 1, 5)
+            if grid[l1:l2, w1:w2].any():
+                continue
+            grid[l1:l2, w1:w2] = 1
+            free_rectangles.occupy(l1, l2, w1, w2)
+            assert set(free_rectangles.rectangles) == get_maximal_rectangles(grid)
+            assert len(free_rectangles.rectangles) == len(set(free_rectangles.rectangles))
+
+
+def test_get_corners():
+    """ On a level 4x4 with an occupied square [0, 2) x [0, 2) a container 2x4 fits only at (2, 0)
+        and a container 2x2 fits at (0, 2) and (2, 0). """
+
+    free_rectangles = FreeRectangles(length=4, width=4)
+    free_rectangles.occupy(0, 2, 0, 2)
+
+    assert free_rectangles.get_corners(length=2, width=4) == {(2, 0)}
+    assert free_rectangles.get_corners(length=2, width=2) == {(0, 2), (2, 0)}
+    assert free_rectangles.get_corners(length=5, width=1) == set()
@@ -7,13 +7,24 @@ class GeneticOptimizer(GreedyOptimizer):
     """
     A genetic optimize class.
     """
-    def __init__(self):
-        super().__init__()
+    def __init__(self, **args):
+        """
+        Constructor.
+        Ships are always packed serially (the random generator and logs are shared) and shipments are always packed
+        again (they depend on the random generator), so processes_nr greater than 1 and reuse_candidates=True
+        are not supported.
+        :param args: an optional dictionary used for changing default settings
+        """
+        if args.get("processes_nr", 1) > 1 or args.get("reuse_candidates", False):
+            raise ValueError("Genetic optimizer does not support processes_nr > 1 or reuse_candidates=True")
+        super().__init__(**args)
         self.generation_numbers = 10
         self.base_population_size = 40
         self.survivors_nr = 20
         self.mutation_probability = 0.1
         self.shuffle_len = -1
+        self.processes_nr = 1
+        self.reuse_candidates = False
 
     @staticmethod
     def info():
@@ -53,7 +64,7 @@ class GeneticOptimizer(GreedyOptimizer):
         """
         Place containers on a single ship in an optimal way using a genetic algorithm.
         :param shipment: a shipment with a ship
-        :param sorted_containers: a sorted list of containers
+        :param sorted_containers: a sorted list (or a pool) of containers
         :param check_urgent_containers: (bool) if True, check timestamps of containers
         :param main_timestamp: a main timestamp
         :param if_sort_by_width: (bool) if True, sort empty points by width, else sort them by length
@@ -65,7 +76,7 @@ class GeneticOptimizer(GreedyOptimizer):
                                                survivors_nr=self.survivors_nr,
                                                mutation_probability=self.mutation_probability,
                                                shuffle_len=self.shuffle_len)
-        genetic_population.generate_initial_population(sorted_containers, shipment)
+        genetic_population.generate_initial_population(list(sorted_containers), shipment)
 
         self.report_generator.increase_indent()
         self.report_generator.log(f"Genetic algorithm for ship {shipment.ship}")
@@ -1,4 +1,8 @@
+import copy
+from concurrent.futures import ProcessPoolExecutor
 from .abstract_optimizer_file import IOptimizer
+from .container_pool_file import ContainerPool
+from .level_template_cache_file import LevelTemplateCache
 from .shipments_manager_file import ShipmentsManager, Shipment, PlacedContainer, CornerPosition
 from containers_module.containers_manager_file import ContainersManager
 
@@ -7,12 +11,25 @@ class GreedyOptimizer(IOptimizer):
     """
     A greedy optimize class.
     """
-    def __init__(self):
+    def __init__(self, **args):
         """
         Constructor.
+        :param args: an optional dictionary used for changing default settings
         """
-        super().__init__()
-        self.sorted_containers = None
+        super().__init__(**args)
+        self.sorted_containers = None   # a pool of containers to place in order of priority (see ContainerPool)
+        self.process_pool = None        # a pool of processes used for packing ships (None if ships are packed serially)
+        self.candidate_shipments = {}   # dict of not accepted shipments of the current optimization (sid -> shipment)
+        self.levels_containers = {}     # dict of ids of containers placed on one-level shipments by the latest packing
+                                        # of a ship (sid -> set of container ids), kept if candidates are reused
+
+        # default settings
+        self.processes_nr = args.get("processes_nr", 1)                 # a number of processes packing candidate ships concurrently
+        self.reuse_candidates = args.get("reuse_candidates", True)      # if reuse not accepted shipments in next rounds
+        self.level_cache_nbytes = args.get("level_cache_nbytes", 32 * 2 ** 20)  # a memory budget of level templates (0 - no cache)
+
+        self.level_cache = LevelTemplateCache(self.level_cache_nbytes) \
+            if self.level_cache_nbytes > 0 else None   # templates of packed levels (None if not used)
 
     @staticmethod
     def info():
@@ -45,6 +62,31 @@ class GreedyOptimizer(IOptimizer):
         for container in sorted_containers:
             self.place_container(shipment, container, single_level, if_sort_by_width)
 
+    def pack_level(self, shipment, containers, if_sort_by_width=False):
+        """
+        Place containers on the lowest level of an empty shipment (see optimize_single_level()). If the same
+        containers (by footprints and order) have already been packed on a ship with the same footprint, the stored
+        template is used instead of searching for places.
+        :param shipment: an empty shipment
+        :param containers: a sorted list (or a pool) of containers
+        :param if_sort_by_width: (bool) if True, sort empty points by width, else sort them by length
+        :return: None
+        """
+        if self.level_cache is None:
+            self.optimize_single_level(shipment, containers, single_level=0, if_sort_by_width=if_sort_by_width)
+            return
+        containers = list(containers)
+        key = self.level_cache.get_key(shipment.ship, containers, if_sort_by_width)
+        template = self.level_cache.get(key)
+        if template is None:
+            self.optimize_single_level(shipment, containers, single_level=0, if_sort_by_width=if_sort_by_width)
+            positions = {x.cid: i for i, x in enumerate(containers)}
+            self.level_cache.put(key, [(positions[x.container.cid], x.corner1.length, x.corner1.width, x.rotated)
+                                       for x in shipment.placed_containers_levels[0]])
+        else:
+            for i, l, w, rotated in template:
+                shipment.place(containers[i], 0, l, w, rotated)
+
     def optimize_single_shipment(self, shipment, sorted_containers,
                                  check_urgent_containers=False,
                                  main_timestamp=None,
@@ -52,7 +94,7 @@ class GreedyOptimizer(IOptimizer):
         """
         Place containers on a single ship in an optimal way using a greedy algorithm.
         :param shipment: a shipment with a ship
-        :param sorted_containers: a sorted list of containers
+        :param sorted_containers: a sorted list (or a pool) of containers
         :param check_urgent_containers: (bool) if True, check timestamps of containers
         :param main_timestamp: a main timestamp
         :param if_sort_by_width: (bool) if True, sort empty points by width, else sort them by length
@@ -60,39 +102,102 @@ class GreedyOptimizer(IOptimizer):
         """
         correct_shipment = True
 
-        containers_copy = sorted_containers.copy()
+        containers_copy = ContainerPool(sorted_containers)
         one_level_shipments = [shipment.copy(only_ship=True) for _ in range(shipment.levels_nr)]
-        one_level_used = [False for _ in range(shipment.levels_nr)]
         for sh in one_level_shipments:
-            self.optimize_single_level(sh, containers_copy, single_level=0, if_sort_by_width=if_sort_by_width)
+            self.pack_level(sh, containers_copy, if_sort_by_width)
             for cont in sh.get_all_containers():
                 containers_copy.remove(cont)
+        one_level_shipments = [sh for sh in one_level_shipments if sh.get_used_levels_nr() > 0]
+        if self.reuse_candidates:
+            self.levels_containers[shipment.ship.sid] = {cid for sh in one_level_shipments for cid in sh.all_containers}
         one_level_shipments.sort(key=lambda x: x.get_empty_volume(only_used_levels=True))
 
-        while True:
-            anything_joined = False
-            for i, sh in enumerate(one_level_shipments):
-                if not one_level_used[i]:
-                    success = shipment.check_and_join(sh)
-                    one_level_used[i] = success
-                    if success:
-                        anything_joined = True
-            if not anything_joined or all(one_level_used):
-                break
+        selected_shipments = self.select_levels(shipment, one_level_shipments)
+        for sh in selected_shipments:
+            shipment.check_and_join(sh)
 
-        if not all(one_level_used):
+        if len(selected_shipments) < len(one_level_shipments):
+            # containers which did not fit on any packed level do not fit on the stacked ones either,
+            # so only levels above the stack are searched for them; containers of left out levels may fill gaps
+            first_level = shipment.get_used_levels_nr()
             for container in sorted_containers:
-                self.place_container(shipment, container)
+                if shipment.contains(container):
+                    continue
+                if container in containers_copy:
+                    for h in range(first_level, shipment.levels_nr):
+                        if self.place_container(shipment, container, h):
+                            break
+                else:
+                    self.place_container(shipment, container)
 
-        placed_containers = shipment.get_all_containers()
         if check_urgent_containers:
-            for container in sorted_containers:
-                if container.timestamp == main_timestamp:
-                    break
-                elif container not in placed_containers:
-                    correct_shipment = False
+            correct_shipment = self.check_urgent_containers(shipment, sorted_containers, main_timestamp)
         return correct_shipment
 
+    @staticmethod
+    def select_levels(shipment, one_level_shipments):
+        """
+        Choose one-level shipments to stack on a shipment and their order. Every level is scored once (by its
+        occupied area) and stability of every pair of levels is checked once, then a chain with the largest
+        summary area is found by dynamic programming over the number of stacked levels: best[k][j] is the largest
+        area of a chain of k levels ending with the level j, where every level is stable on the previous one
+        and levels keep their order in the given list.
+        :param shipment: a shipment
+        :param one_level_shipments: a list of non-empty one-level shipments (in order of preference)
+        :return: a list of chosen one-level shipments in order of stacking (from the bottom)
+        """
+        levels_nr = min(shipment.levels_nr - shipment.get_used_levels_nr(), len(one_level_shipments))
+        if levels_nr == 0:
+            return []
+        areas = [sh.get_occupied_volume() for sh in one_level_shipments]
+        on_shipment = [shipment.check_if_supports(sh) for sh in one_level_shipments]
+        on_level = [[i < j and x.check_if_supports(y) for j, y in enumerate(one_level_shipments)]
+                    for i, x in enumerate(one_level_shipments)]
+
+        best = [[areas[j] if on_shipment[j] else None for j in range(len(areas))]]
+        previous = [[None for _ in areas]]
+        for k in range(1, levels_nr):
+            best.append([None for _ in areas])
+            previous.append([None for _ in areas])
+            for j in range(len(areas)):
+                for i in range(j):
+                    if on_level[i][j] and best[k - 1][i] is not None and \
+                            (best[k][j] is None or best[k - 1][i] + areas[j] > best[k][j]):
+                        best[k][j] = best[k - 1][i] + areas[j]
+                        previous[k][j] = i
+
+        end = None
+        for k in range(levels_nr):
+            for j in range(len(areas)):
+                if best[k][j] is not None and (end is None or best[k][j] > best[end[0]][end[1]]):
+                    end = (k, j)
+        if end is None:
+            return []
+        k, j = end
+        chain = []
+        while j is not None:
+            chain.append(one_level_shipments[j])
+            j = previous[k][j]
+            k -= 1
+        return chain[::-1]
+
+    @staticmethod
+    def check_urgent_containers(shipment, sorted_containers, main_timestamp):
+        """
+        Check if all containers with timestamps lower than the main timestamp are in a given shipment.
+        :param shipment: a shipment
+        :param sorted_containers: a sorted list of containers
+        :param main_timestamp: a main timestamp
+        :return: True if all urgent containers are in the shipment, else False
+        """
+        for container in sorted_containers:
+            if container.timestamp == main_timestamp:
+                break
+            elif not shipment.contains(container):
+                return False
+        return True
+
     def check_and_add_shipment(self, shipment):
         """
         Check if a given shipment can be added to the shipments manager.
@@ -104,8 +209,44 @@ class GreedyOptimizer(IOptimizer):
         if success:
             for container in shipment.get_all_containers():
                 self.sorted_containers.remove(container)
+            self.update_candidate_shipments(shipment)
         return success
 
+    def update_candidate_shipments(self, accepted_shipment):
+        """
+        Discard candidate shipments which can not be reused after a given shipment is accepted.
+        A candidate is discarded (and its ship is packed again) only if packing the remaining containers could give
+        another shipment (see optimize_single_shipment()). Containers which are tried but not placed do not change a shipment (a remembered failure only skips
+        a search which would fail), so removing them from the pool changes neither packed levels, nor levels chosen
+        by select_levels(), nor places found for the rest of containers. Containers placed on any one-level shipment
+        are not such ones, even if select_levels() has left their level out and they are not in the candidate:
+        without them the level is packed differently, and the choice of levels may change. So a candidate is kept
+        if the accepted shipment has no container of it and no container of its one-level shipments.
+        :param accepted_shipment: an accepted shipment
+        :return:
+        """
+        accepted_containers = accepted_shipment.get_all_containers()
+        self.candidate_shipments = {sid: sh for sid, sh in self.candidate_shipments.items()
+                                    if sh is not accepted_shipment and
+                                    not any(sh.contains(x) or x.cid in self.levels_containers[sid]
+                                            for x in accepted_containers)}
+
+    def get_candidate_shipments(self, ships):
+        """
+        Get a shipment with the remaining containers for every given ship. Shipments of the previous round, which
+        have not been discarded (see update_candidate_shipments()), are reused without packing: they are the same
+        as packing their ships again, because no container they have placed, also on one-level shipments left out
+        by select_levels(), has been accepted since.
+        :param ships: a list of ships
+        :return: a list of shipments
+        """
+        packed_ships = [s for s in ships if s.sid not in self.candidate_shipments]
+        shipments = {s.sid: sh for s, (sh, _) in zip(packed_ships,
+                                                      self.optimize_shipments(packed_ships, self.sorted_containers))}
+        if self.reuse_candidates:
+            self.candidate_shipments.update(shipments)
+        return [shipments[s.sid] if s.sid in shipments else self.candidate_shipments[s.sid] for s in ships]
+
     def choose_and_add_shipment(self, shipments_list):
         """
         Add a shipment with the smallest relative empty volume to the shipments manager.
@@ -120,9 +261,77 @@ class GreedyOptimizer(IOptimizer):
                 break
         return success
 
+    def _get_worker_copy(self):
+        """
+        Private method.
+        Get a shallow copy of the optimizer which can be sent to a worker process (without a report generator,
+        a pool of processes and data of the current optimization).
+        :return: a copy of the optimizer
+        """
+        worker = copy.copy(self)
+        worker.report_generator = None
+        worker.process_pool = None
+        worker.level_cache = None
+        worker.shipments_manager = None
+        worker.ships = None
+        worker.containers = None
+        worker.sorted_containers = None
+        worker.previous_shipment = None
+        worker.candidate_shipments = {}
+        worker.levels_containers = {}
+        return worker
+
+    def create_packed_shipment(self, ship, placed, order, containers_index):
+        """
+        Rebuild a shipment packed in a worker process.
+        :param ship: a ship
+        :param placed: a list of tuples (container id, height level, length, width, rotated) in order of levels
+                       and of placed containers on every level
+        :param order: a list of container ids in order of adding to the packed shipment
+        :param containers_index: a dict of containers (cid -> container)
+        :return: a shipment with containers
+        """
+        shipment = self.create_shipment(ship)
+        for cid, h, l, w, rotated in placed:
+            shipment.check_and_add(PlacedContainer(containers_index[cid],
+                                                   CornerPosition(length=l, width=w, height_level=h), rotated))
+        shipment.all_containers = {cid: shipment.all_containers[cid] for cid in order}
+        shipment.placed_containers_index = {cid: shipment.placed_containers_index[cid] for cid in order}
+        return shipment
+
+    def optimize_shipments(self, ships, sorted_containers, check_urgent_containers=False, main_timestamp=None):
+        """
+        Create a shipment for every given ship and place containers on it (see optimize_single_shipment()).
+        Ships are packed independently, so if the pool of processes is running, they are packed concurrently
+        and the shipments are rebuilt from placements by container ids. The results are the same as in serial mode.
+        :param ships: a list of ships
+        :param sorted_containers: a sorted list of containers
+        :param check_urgent_containers: (bool) if True, check timestamps of containers
+        :param main_timestamp: a main timestamp
+        :return: a list of tuples (shipment, True if the shipment is correct)
+        """
+        if self.process_pool is None or len(ships) < 2:
+            shipments = [self.create_shipment(s) for s in ships]
+            return [(sh, self.optimize_single_shipment(sh, sorted_containers, check_urgent_containers, main_timestamp))
+                    for sh in shipments]
+        worker = self._get_worker_copy()
+        futures = [self.process_pool.submit(pack_ship, worker, s, sorted_containers, check_urgent_containers,
+                                            main_timestamp) for s in ships]
+        containers_index = {x.cid: x for x in sorted_containers}
+        results = []
+        for ship, future in zip(ships, futures):
+            correct, placed, order, levels_containers = future.result()
+            if self.reuse_candidates:
+                self.levels_containers[ship.sid] = levels_containers
+            results.append((self.create_packed_shipment(ship, placed, order, containers_index), correct))
+        return results
+
     def optimize(self, ships, containers, timestamp, container_height, previous_shipment):
         """
         Place containers on ships in an optimal way.
+        If processes_nr is greater than 1, candidate ships are packed concurrently by a pool of processes.
+        If reuse_candidates is True, shipments which are not accepted in a round are reused in next rounds as long as
+        no container placed while packing them has been accepted (see update_candidate_shipments()).
         :param ships: list of available ships
         :param containers: a list container to place
         :param timestamp: a main timestamp of containers
@@ -145,39 +354,64 @@ class GreedyOptimizer(IOptimizer):
             self.report_generator.log("******* OPTIMIZER LOG START *******")
             self.report_generator.increase_indent()
 
-        self.sorted_containers = sorted(containers, key=self.prioritize_containers)
-        if self.report_generator is not None:
-            self.report_generator.log(f"{len(self.sorted_containers)} containers to place.")
-        first_shipments = [Shipment(ship=s, containers_height=container_height) for s in ships]
-        correct_first_shipments = [sh for sh in first_shipments if
-                                   self.optimize_single_shipment(sh, self.sorted_containers,
-                                                                 check_urgent_containers=True,
-                                                                 main_timestamp=timestamp)]
-
-        if len(correct_first_shipments) == 0:
+        if self.processes_nr > 1 and len(ships) > 1:
+            self.process_pool = ProcessPoolExecutor(max_workers=min(self.processes_nr, len(ships)))
+
+        try:
+            self.sorted_containers = ContainerPool(sorted(containers, key=self.prioritize_containers))
             if self.report_generator is not None:
-                """
-                That is the described situation when to use previous_shipment.
-                """
-                self.report_generator.log("CAN NOT SEND CONTAINERS WITH PREVIOUS TIMESTAMPS USING CURRENT SHIPS."
-                                          "PREVIOUS SHIP IS USED")
-            self.check_and_add_shipment(previous_shipment)
-        else:
-            self.choose_and_add_shipment(correct_first_shipments)
+                self.report_generator.log(f"{len(self.sorted_containers)} containers to place.")
+            first_shipments = self.optimize_shipments(ships, self.sorted_containers, check_urgent_containers=True,
+                                                      main_timestamp=timestamp)
+            correct_first_shipments = [sh for sh, correct in first_shipments if correct]
+            self.candidate_shipments = {s.sid: sh for s, (sh, _) in zip(ships, first_shipments)} \
+                if self.reuse_candidates else {}
 
-        while len(self.sorted_containers) > 0:
-            self.report_generator.log(f"{len(self.sorted_containers)} containers to place.")
-            shipments = [Shipment(ship=s, containers_height=container_height) for s in ships]
-            for sh in shipments:
-                self.optimize_single_shipment(sh, self.sorted_containers)
-            self.choose_and_add_shipment(shipments)
+            if len(correct_first_shipments) == 0:
+                if self.report_generator is not None:
+                    """
+                    That is the described situation when to use previous_shipment.
+                    """
+                    self.report_generator.log("CAN NOT SEND CONTAINERS WITH PREVIOUS TIMESTAMPS USING CURRENT SHIPS."
+                                              "PREVIOUS SHIP IS USED")
+                self.check_and_add_shipment(previous_shipment)
+            else:
+                self.choose_and_add_shipment(correct_first_shipments)
 
+            while len(self.sorted_containers) > 0:
+                if self.report_generator is not None:
+                    self.report_generator.log(f"{len(self.sorted_containers)} containers to place.")
+                self.choose_and_add_shipment(self.get_candidate_shipments(ships))
+        finally:
+            self.candidate_shipments = {}
+            self.levels_containers = {}
+            if self.process_pool is not None:
+                self.process_pool.shutdown()
+                self.process_pool = None
         if self.report_generator is not None:
             self.report_generator.decrease_indent()
             self.report_generator.log("******* OPTIMIZER LOG STOP ********\n")
         return self.shipments_manager
 
 
+def pack_ship(optimizer, ship, sorted_containers, check_urgent_containers, main_timestamp):
+    """
+    Pack a single ship in a worker process (see GreedyOptimizer.optimize_shipments()).
+    :param optimizer: an optimizer (a copy without data of the current optimization)
+    :param ship: a ship
+    :param sorted_containers: a sorted list of containers
+    :param check_urgent_containers: (bool) if True, check timestamps of containers
+    :param main_timestamp: a main timestamp
+    :return: a tuple (True if the shipment is correct, placed containers, order of container ids,
+             ids of containers placed on one-level shipments) (see GreedyOptimizer.create_packed_shipment())
+    """
+    shipment = optimizer.create_shipment(ship)
+    correct = optimizer.optimize_single_shipment(shipment, sorted_containers, check_urgent_containers, main_timestamp)
+    placed = [(x.container.cid, x.corner1.height_level, x.corner1.length, x.corner1.width, x.rotated)
+              for level in shipment.placed_containers_levels for x in level]
+    return correct, placed, list(shipment.all_containers), optimizer.levels_containers.get(ship.sid, set())
+
+
 def test():
     cm = ContainersManager()
     cm.add("c10,1,2,2,5", min_timestamp=0)
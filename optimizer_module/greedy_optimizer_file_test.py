@@ -0,0 +1,154 @@
+import pytest
+from containers_module.container_file import Container
+from ships_module.ship_file import Ship
+from optimizer_module.corner_position_file import CornerPosition
+from optimizer_module.placed_container_file import PlacedContainer
+from optimizer_module.shipment_file import Shipment
+from optimizer_module.greedy_optimizer_file import GreedyOptimizer
+from optimizer_module.genetic_optimizer_file import GeneticOptimizer
+from optimizer_module.multi_resolution_optimizer_file import MultiResolutionOptimizer
+
+
+def get_placements(shipments_manager):
+    """ Get ships, placed containers on every level and orders of adding containers of all shipments. """
+
+    return [(sh.ship.sid,
+             [(x.container.cid, x.corner1.height_level, x.corner1.length, x.corner1.width, x.rotated)
+              for level in sh.placed_containers_levels for x in level],
+             list(sh.all_containers)) for sh in shipments_manager.shipments]
+
+
+def test_parallel_optimize():
+    """ Three ships are packed by a pool of 2 processes. Shipments are the same as in serial mode (also with
+        rotation) and they contain the original container objects. Candidate shipments are not sent to workers. """
+
+    ships = [Ship(sid=i, length=12 + 3 * i, width=10 + 2 * i, height=30, timestamp=0) for i in range(3)]
+    containers = [Container(cid=i, length=1 + i % 5, width=2 + (3 * i) % 7, height=10, timestamp=1)
+                  for i in range(150)]
+    for args in [{}, {"rotation": True}]:
+        serial = GreedyOptimizer(**args).optimize(ships, containers, timestamp=1, container_height=10,
+                                                  previous_shipment=None)
+        optimizer = GreedyOptimizer(processes_nr=2, **args)
+        parallel = optimizer.optimize(ships, containers, timestamp=1, container_height=10, previous_shipment=None)
+        assert get_placements(parallel) == get_placements(serial)
+        assert all(x is containers[x.cid] for x in parallel.get_containers())
+        assert optimizer.process_pool is None
+
+    optimizer = GreedyOptimizer(processes_nr=2)
+    optimizer.candidate_shipments = {0: Shipment(ships[0], containers_height=10)}
+    assert optimizer._get_worker_copy().candidate_shipments == {}
+    assert len(optimizer.candidate_shipments) == 1
+
+
+class FailingOptimizer(GreedyOptimizer):
+    """ An optimizer which fails when choosing a shipment (a class on the module level can be sent to workers). """
+
+    def choose_and_add_shipment(self, shipments_list):
+        self.used_pool = self.process_pool
+        raise RuntimeError("choosing failed")
+
+
+def test_parallel_optimize_failure():
+    """ If choosing a shipment fails, the exception is raised by optimize() and the pool of processes is shut down
+        anyway. """
+
+    ships = [Ship(sid=i, length=12, width=10, height=30, timestamp=0) for i in range(2)]
+    containers = [Container(cid=i, length=2, width=3, height=10, timestamp=1) for i in range(20)]
+    optimizer = FailingOptimizer(processes_nr=2)
+    with pytest.raises(RuntimeError):
+        optimizer.optimize(ships, containers, timestamp=1, container_height=10, previous_shipment=None)
+    assert optimizer.used_pool is not None
+    assert optimizer.process_pool is None
+    with pytest.raises(RuntimeError):
+        optimizer.used_pool.submit(abs, -1)
+
+
+class CountingOptimizer(GreedyOptimizer):
+    """ An optimizer which counts shipments of previous rounds reused as candidates. """
+
+    reused_nr = 0
+
+    def get_candidate_shipments(self, ships):
+        self.reused_nr += sum(s.sid in self.candidate_shipments for s in ships)
+        return super().get_candidate_shipments(ships)
+
+
+def test_reuse_candidates():
+    """ Shipments are the same whether candidates are reused or packed again in every round (also with rotation
+        and in parallel mode). Candidates are reused when long containers fit only some ships.
+        On a 13x9 ship with 4 levels c32 10x1 is placed on a level left out by select_levels() and then it is
+        accepted on a 12x4 ship. Without c32 the left out level is packed differently and the 13x9 ship gets other
+        levels, so its candidate is not reused. """
+
+    ships = [Ship(sid=0, length=13, width=9, height=40, timestamp=0),
+             Ship(sid=1, length=12, width=4, height=20, timestamp=0)]
+    sizes = [(2, 2), (4, 4), (12, 6), (9, 5), (6, 2), (13, 7), (12, 7), (7, 6), (2, 6), (7, 3), (10, 4), (9, 4),
+             (4, 5), (1, 6), (9, 7), (12, 1), (2, 7), (7, 7), (6, 7), (8, 2), (9, 4), (1, 2), (1, 2), (10, 1),
+             (4, 1), (11, 3), (11, 7), (7, 7), (9, 3), (3, 5), (8, 7), (2, 2), (10, 1), (9, 3)]
+    containers = [Container(cid=i, length=l, width=w, height=10, timestamp=1) for i, (l, w) in enumerate(sizes)]
+    workloads = [(ships, containers, {})]
+
+    ships = [Ship(sid=0, length=20, width=6, height=30, timestamp=0),
+             Ship(sid=1, length=10, width=14, height=20, timestamp=0),
+             Ship(sid=2, length=15, width=10, height=30, timestamp=0)]
+    containers = [Container(cid=i, length=1 + (7 * i) % 18, width=1 + (5 * i) % 6, height=10, timestamp=1)
+                  for i in range(150)]
+    workloads += [(ships, containers, {}), (ships, containers, {"rotation": True}),
+                  (ships, containers, {"processes_nr": 2})]
+
+    for ships, containers, args in workloads:
+        packed = GreedyOptimizer(reuse_candidates=False, **args).optimize(ships, containers, timestamp=1,
+                                                                          container_height=10, previous_shipment=None)
+        optimizer = CountingOptimizer(reuse_candidates=True, **args)
+        reused = optimizer.optimize(ships, containers, timestamp=1, container_height=10, previous_shipment=None)
+        assert get_placements(reused) == get_placements(packed)
+        assert optimizer.reused_nr > 0
+        assert optimizer.levels_containers == {}
+
+
+def test_unsupported_settings():
+    """ The genetic optimizer always packs ships serially and again, the multi-resolution optimizer always packs
+        them again. Asking them for concurrent packing or reusing candidates fails instead of being ignored.
+        A sparse occupancy map tries free rectangles by default and rejects "first_fit", which needs dense maps.
+        An unknown placement strategy fails instead of silently falling back to "first_fit". """
+
+    assert GeneticOptimizer(processes_nr=1, reuse_candidates=False).processes_nr == 1
+    assert not MultiResolutionOptimizer(coarse_factor=2).reuse_candidates
+    assert GreedyOptimizer(occupancy_map_type="sparse").placement_strategy == "free_rectangles"
+    assert GreedyOptimizer(occupancy_map_type="dense").placement_strategy == "first_fit"
+    for optimizer_class, args in [(GeneticOptimizer, {"processes_nr": 2}),
+                                  (GeneticOptimizer, {"reuse_candidates": True}),
+                                  (MultiResolutionOptimizer, {"reuse_candidates": True}),
+                                  (GreedyOptimizer, {"occupancy_map_type": "sparse",
+                                                     "placement_strategy": "first_fit"}),
+                                  (GreedyOptimizer, {"placement_strategy": "best_fit"}),
+                                  (GeneticOptimizer, {"placement_strategy": "extreme_point"})]:
+        with pytest.raises(ValueError):
+            optimizer_class(**args)
+
+
+def test_select_levels():
+    """ On a 4x4 ship with 2 levels, level A has c1 4x2 at (0, 2), level B has c2 3x2 at (0, 0) and level C has
+        c3 2x2 at (0, 0). Nothing is stable on A, so stacking C on B (area 10) is better than A alone (area 8).
+        Then c1 is placed by the fallback next to c2. """
+
+    s1 = Ship(sid=1, length=4, width=4, height=20, timestamp=0)
+    c1 = Container(cid=1, length=4, width=2, height=10, timestamp=0)
+    c2 = Container(cid=2, length=3, width=2, height=10, timestamp=0)
+    c3 = Container(cid=3, length=2, width=2, height=10, timestamp=0)
+    one_level_shipments = []
+    for container, width in [(c1, 2), (c2, 0), (c3, 0)]:
+        sh = Shipment(s1, containers_height=10)
+        assert sh.check_and_add(PlacedContainer(container, CornerPosition(length=0, width=width, height_level=0)))
+        one_level_shipments.append(sh)
+    level_a, level_b, level_c = one_level_shipments
+
+    shipment = Shipment(s1, containers_height=10)
+    assert GreedyOptimizer.select_levels(shipment, one_level_shipments) == [level_b, level_c]
+    assert GreedyOptimizer.select_levels(shipment, [level_a, level_c]) == [level_a]
+
+    optimizer = GreedyOptimizer()
+    optimizer.container_height = 10
+    shipment = optimizer.create_shipment(s1)
+    optimizer.optimize_single_shipment(shipment, [c1, c2, c3])
+    assert len(shipment.get_all_containers()) == 3
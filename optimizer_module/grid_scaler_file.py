@@ -0,0 +1,108 @@
+from math import gcd
+from functools import reduce
+from .shipment_file import Shipment
+from .placed_container_file import PlacedContainer
+from .corner_position_file import CornerPosition
+from containers_module.container_file import Container
+from ships_module.ship_file import Ship
+
+
+class GridScaler:
+    """
+    Class used for compressing a placement grid. If all lengths and widths of ships and containers are multiples
+    of a common factor, then optimizers can work on a grid scaled down by this factor, and placements are mapped back
+    to real coordinates afterwards.
+    Scaled ships and containers are created once, so the same real object is always mapped to the same scaled one.
+    """
+    def __init__(self, ships, containers):
+        """
+        Constructor.
+        :param ships: a list of all ships
+        :param containers: a list of all containers
+        """
+        dimensions = [x.length for x in ships + containers] + [x.width for x in ships + containers]
+        self.factor = reduce(gcd, dimensions, 0) or 1   # the greatest common divisor of all lengths and widths
+
+        self.real_ships = {}            # dict of real ships (sid -> ship)
+        self.real_containers = {}       # dict of real containers (cid -> container)
+        self.scaled_ships = {}          # dict of scaled ships (sid -> ship)
+        self.scaled_containers = {}     # dict of scaled containers (cid -> container)
+
+    def scale_ships(self, ships):
+        """
+        Get ships scaled down by the factor.
+        :param ships: a list of real ships
+        :return: a list of scaled ships
+        """
+        if self.factor == 1:
+            return ships
+        result = []
+        for ship in ships:
+            if ship.sid not in self.scaled_ships:
+                self.real_ships[ship.sid] = ship
+                self.scaled_ships[ship.sid] = Ship(sid=ship.sid, length=ship.length // self.factor,
+                                                   width=ship.width // self.factor, height=ship.height,
+                                                   timestamp=ship.timestamp)
+            result.append(self.scaled_ships[ship.sid])
+        return result
+
+    def scale_containers(self, containers):
+        """
+        Get containers scaled down by the factor.
+        :param containers: a list of real containers
+        :return: a list of scaled containers
+        """
+        if self.factor == 1:
+            return containers
+        result = []
+        for container in containers:
+            if container.cid not in self.scaled_containers:
+                self.real_containers[container.cid] = container
+                self.scaled_containers[container.cid] = Container(cid=container.cid,
+                                                                  length=container.length // self.factor,
+                                                                  width=container.width // self.factor,
+                                                                  height=container.height,
+                                                                  timestamp=container.timestamp)
+            result.append(self.scaled_containers[container.cid])
+        return result
+
+    def unscale_containers(self, containers):
+        """
+        Get real containers corresponding to scaled ones.
+        :param containers: a list of scaled containers
+        :return: a list of real containers
+        """
+        if self.factor == 1:
+            return containers
+        return [self.real_containers[x.cid] for x in containers]
+
+    def unscale_shipment(self, shipment):
+        """
+        Get a shipment with real ship, real containers and positions in real coordinates.
+        :param shipment: a shipment created on the scaled grid
+        :return: a shipment on the real grid
+        """
+        if self.factor == 1 or shipment is None:
+            return shipment
+        real_shipment = Shipment(self.real_ships[shipment.ship.sid], containers_height=shipment.containers_height,
+                                 occupancy_map_type=shipment.occupancy_map_type)
+        for level in shipment.placed_containers_levels:
+            for placed_container in level:
+                corner1 = CornerPosition(height_level=placed_container.corner1.height_level,
+                                         length=placed_container.corner1.length * self.factor,
+                                         width=placed_container.corner1.width * self.factor)
+                real_shipment.check_and_add(PlacedContainer(container=self.real_containers[placed_container.container.cid],
+                                                            corner1=corner1, rotated=placed_container.rotated))
+        return real_shipment
+
+    def unscale_shipments(self, shipments):
+        """
+        Get shipments on the real grid.
+        :param shipments: a list of shipments created on the scaled grid
+        :return: a list of shipments on the real grid
+        """
+        return [self.unscale_shipment(x) for x in shipments]
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,46 @@
+from containers_module.container_file import Container
+from ships_module.ship_file import Ship
+from optimizer_module.greedy_optimizer_file import GreedyOptimizer
+from optimizer_module.grid_scaler_file import GridScaler
+
+
+def test_factor():
+    """ All lengths and widths are multiples of 5, so the factor is 5. If a single dimension is not a multiple of 5,
+        the factor is 1 and the scaler returns given objects. """
+
+    s1 = Ship(sid=1, length=50, width=60, height=20, timestamp=39)
+    c1 = Container(cid=1, length=10, width=15, height=10, timestamp=39)
+    c2 = Container(cid=2, length=5, width=20, height=10, timestamp=39)
+    c3 = Container(cid=3, length=5, width=21, height=10, timestamp=39)
+
+    assert GridScaler([s1], [c1, c2]).factor == 5
+    grid_scaler = GridScaler([s1], [c1, c2, c3])
+    assert grid_scaler.factor == 1
+    assert grid_scaler.scale_containers([c1, c2, c3]) == [c1, c2, c3]
+
+
+def test_optimize_on_compressed_grid():
+    """ Containers are placed by the greedy optimizer on a grid compressed 5 times. Mapped back shipments contain
+        real containers on the real ship, their positions are multiples of 5 and every container is placed once. """
+
+    s1 = Ship(sid=1, length=50, width=50, height=20, timestamp=0)
+    containers = [Container(cid=i, length=5 * (1 + i % 4), width=5 * (1 + i % 3), height=10, timestamp=0)
+                  for i in range(30)]
+    grid_scaler = GridScaler([s1], containers)
+    scaled_ships = grid_scaler.scale_ships([s1])
+    assert grid_scaler.factor == 5
+    assert (scaled_ships[0].length, scaled_ships[0].width) == (10, 10)
+    assert grid_scaler.scale_ships([s1])[0] is scaled_ships[0]
+
+    optimizer = GreedyOptimizer()
+    shipments_manager = optimizer.optimize(scaled_ships, grid_scaler.scale_containers(containers), timestamp=0,
+                                           container_height=10, previous_shipment=None)
+    shipments = grid_scaler.unscale_shipments(shipments_manager.shipments)
+
+    placed = [x for shipment in shipments for level in shipment.placed_containers_levels for x in level]
+    assert all(shipment.ship is s1 for shipment in shipments)
+    assert sorted(x.container.cid for x in placed) == list(range(30))
+    assert all(x.container is containers[x.container.cid] for x in placed)
+    assert all(x.corner1.length % 5 == 0 and x.corner1.width % 5 == 0 for x in placed)
+    assert sum(len(x.get_all_containers()) for x in shipments) == \
+        sum(len(x.get_all_containers()) for x in shipments_manager.shipments)
@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import numpy as np
+
+
+class LevelTemplateCache:
+    """
+    Class used for remembering packings of single levels (templates).
+    Packing a level depends only on a footprint of a ship, footprints of containers in a given order and a way
+    of sorting empty places, so a template is stored as a list of placements relative to the order of containers
+    and it can be reused for the same ship or for other ships with the same footprint.
+    Keys and templates are stored as bytes of int32 arrays. The least recently used templates are evicted when
+    the total size exceeds a memory budget.
+    """
+    def __init__(self, max_nbytes=32 * 2 ** 20):
+        """
+        Constructor.
+        :param max_nbytes: a memory budget in bytes (sizes of keys and templates)
+        """
+        self.max_nbytes = max_nbytes        # a memory budget in bytes
+        self.nbytes = 0                     # a current size of keys and templates in bytes
+        self.templates = OrderedDict()      # dict of templates in order of use (key -> bytes of placements)
+        self.hits_nr = 0                    # number of found templates
+        self.misses_nr = 0                  # number of not found templates
+
+    def __len__(self):
+        """
+        Get a number of stored templates. Used when call len(cache).
+        :return: a number of stored templates
+        """
+        return len(self.templates)
+
+    @staticmethod
+    def get_key(ship, containers, if_sort_by_width):
+        """
+        Get a key of a level packing.
+        :param ship: a ship
+        :param containers: a list of containers in order of placing
+        :param if_sort_by_width: (bool) if True, empty points are sorted by width, else by length
+        :return: a key
+        """
+        footprints = np.array([(x.length, x.width) for x in containers], dtype=np.int32).tobytes()
+        return ship.length, ship.width, bool(if_sort_by_width), footprints
+
+    def get(self, key):
+        """
+        Get a template of a level packing and mark it as recently used.
+        :param key: a key (see get_key())
+        :return: a list of tuples (position of a container in the order, length, width, rotated)
+                 or None if there is no template
+        """
+        template = self.templates.get(key)
+        if template is None:
+            self.misses_nr += 1
+            return None
+        self.hits_nr += 1
+        self.templates.move_to_end(key)
+        return [(i, l, w, bool(rotated)) for i, l, w, rotated in np.frombuffer(template, dtype=np.int32)
+                .reshape(-1, 4).tolist()]
+
+    def put(self, key, placements):
+        """
+        Store a template of a level packing. The least recently used templates are evicted if the memory budget
+        is exceeded. A template bigger than the whole budget is not stored.
+        :param key: a key (see get_key())
+        :param placements: a list of tuples (position of a container in the order, length, width, rotated)
+        :return:
+        """
+        template = np.array(placements, dtype=np.int32).reshape(-1, 4).tobytes()
+        nbytes = len(key[-1]) + len(template)
+        if nbytes > self.max_nbytes:
+            return
+        if key in self.templates:
+            self.nbytes -= len(key[-1]) + len(self.templates.pop(key))
+        self.templates[key] = template
+        self.nbytes += nbytes
+        while self.nbytes > self.max_nbytes:
+            old_key, old_template = self.templates.popitem(last=False)
+            self.nbytes -= len(old_key[-1]) + len(old_template)
+
+
+if __name__ == "__main__":
+    pass
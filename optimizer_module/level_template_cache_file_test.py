@@ -0,0 +1,43 @@
+from containers_module.container_file import Container
+from ships_module.ship_file import Ship
+from optimizer_module.greedy_optimizer_file import GreedyOptimizer
+from optimizer_module.level_template_cache_file import LevelTemplateCache
+
+
+def test_lru_eviction():
+    """ Every template of 2 containers takes 2 * 8 bytes of a key and 2 * 16 bytes of placements, so a budget
+        of 100 bytes holds 2 templates. After using the first one, adding a third one evicts the second one. """
+
+    ship = Ship(sid=1, length=10, width=10, height=20, timestamp=0)
+    containers = [Container(cid=i, length=1 + i, width=2, height=10, timestamp=0) for i in range(4)]
+    cache = LevelTemplateCache(max_nbytes=100)
+    keys = [cache.get_key(ship, containers[i:i + 2], False) for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, [(0, 0, 0, False), (1, i, 5, True)])
+    assert cache.nbytes == 96
+    assert cache.get(keys[0]) == [(0, 0, 0, False), (1, 0, 5, True)]
+    cache.put(keys[2], [(0, 0, 0, False), (1, 2, 5, False)])
+    assert len(cache) == 2 and cache.nbytes == 96
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) == [(0, 0, 0, False), (1, 2, 5, False)]
+    assert cache.get_key(ship, containers[0:2], True) != keys[0]
+
+
+def test_same_sized_ships():
+    """ Two ships with the same length and width pack the same levels, so the second one uses templates only
+        and the shipments are the same as without the cache. """
+
+    ships = [Ship(sid=1, length=12, width=9, height=30, timestamp=0),
+             Ship(sid=2, length=12, width=9, height=30, timestamp=0)]
+    containers = [Container(cid=i, length=1 + i % 5, width=2 + (3 * i) % 7, height=10, timestamp=1)
+                  for i in range(60)]
+    shipments = []
+    for level_cache_nbytes in [0, 2 ** 20]:
+        optimizer = GreedyOptimizer(level_cache_nbytes=level_cache_nbytes)
+        optimizer.container_height = 10
+        shipment_1, shipment_2 = [sh for sh, _ in optimizer.optimize_shipments(ships, containers)]
+        shipments.append([[(x.container.cid, x.corner1.height_level, x.corner1.length, x.corner1.width)
+                           for level in sh.placed_containers_levels for x in level] for sh in [shipment_1, shipment_2]])
+    assert optimizer.level_cache.hits_nr == 3 and optimizer.level_cache.misses_nr == 3
+    assert shipments[0] == shipments[1]
+    assert shipments[1][0] == shipments[1][1]
@@ -0,0 +1,66 @@
+import random
+from containers_module.container_file import Container
+from ships_module.ship_file import Ship
+from optimizer_module.shipment_file import Shipment
+from optimizer_module.multi_resolution_optimizer_file import MultiResolutionOptimizer
+from optimizer_module.solution_validator_file import SolutionValidator
+
+
+def get_placements(shipments_manager):
+    """ Get a dictionary of placements (cid -> (sid, height level, length, width)) of a shipments manager. """
+
+    return {x.container.cid: (shipment.ship.sid, x.corner1.height_level, x.corner1.length, x.corner1.width)
+            for shipment in shipments_manager.shipments for level in shipment.placed_containers_levels for x in level}
+
+
+def test_valid_packing():
+    """ Solutions found by the multi-resolution optimizer (also with rotation) are valid and ship every container
+        exactly once. """
+
+    random.seed(0)
+    ships = [Ship(sid=i, length=40 - 3 * i, width=36 - 2 * i, height=30, timestamp=0) for i in range(3)]
+    containers = [Container(cid=i, length=random.randint(3, 13), width=random.randint(3, 13), height=10, timestamp=1)
+                  for i in range(120)]
+    for optimizer in [MultiResolutionOptimizer(coarse_factor=3), MultiResolutionOptimizer(rotation=True)]:
+        shipments_manager = optimizer.optimize(ships, containers, timestamp=1, container_height=10,
+                                               previous_shipment=None)
+        assert SolutionValidator.get_errors(shipments_manager) == []
+        assert sum(len(x.get_all_containers()) for x in shipments_manager.shipments) == len(containers)
+        assert set(get_placements(shipments_manager)) == {x.cid for x in containers}
+
+
+def test_slide():
+    """ On a 10x10 ship c1 3x3 is at (0, 0). c2 3x3 put at (4, 4) slides along the length to (0, 4) and then along
+        the width to (0, 3), where it touches c1. """
+
+    s1 = Ship(sid=1, length=10, width=10, height=10, timestamp=0)
+    c1 = Container(cid=1, length=3, width=3, height=10, timestamp=0)
+    c2 = Container(cid=2, length=3, width=3, height=10, timestamp=0)
+    sh = Shipment(s1, containers_height=10)
+    sh.place(c1, 0, 0, 0)
+    assert MultiResolutionOptimizer.slide(sh, c2, 0, 4, 4) == (0, 3)
+
+
+def test_reclaim_slack():
+    """ With a coarse factor 4, containers 5x3 become 2x1 coarse cells (8x4) and fill a 2x2 coarse ship (10x10
+        rounded down to 8x8). Refined at full resolution, the second one slides from width 4 to width 3. """
+
+    s1 = Ship(sid=1, length=10, width=10, height=10, timestamp=0)
+    containers = [Container(cid=i, length=5, width=3, height=10, timestamp=1) for i in range(2)]
+    optimizer = MultiResolutionOptimizer(coarse_factor=4)
+    shipments_manager = optimizer.optimize([s1], containers, timestamp=1, container_height=10,
+                                           previous_shipment=None)
+    assert SolutionValidator.validate(shipments_manager)
+    assert sorted(get_placements(shipments_manager).values()) == [(1, 0, 0, 0), (1, 0, 0, 3)]
+
+
+def test_not_fitting_coarse_ship():
+    """ With a coarse factor 4, a 9x9 container becomes 3x3 coarse cells, which do not fit a 10x10 ship rounded
+        down to 2x2 coarse cells. It is placed at full resolution instead. """
+
+    s1 = Ship(sid=1, length=10, width=10, height=10, timestamp=0)
+    c1 = Container(cid=1, length=9, width=9, height=10, timestamp=1)
+    optimizer = MultiResolutionOptimizer(coarse_factor=4)
+    shipments_manager = optimizer.optimize([s1], [c1], timestamp=1, container_height=10, previous_shipment=None)
+    assert SolutionValidator.validate(shipments_manager)
+    assert get_placements(shipments_manager) == {1: (1, 0, 0, 0)}
@@ -0,0 +1,515 @@
+import copy
+import numpy as np
+from sortedcontainers import SortedList
+
+
+class OccupancyMap:
+    """
+    Class used for storing occupancy of a ship grid (a dense backend).
+    Every cell on every level is stored as one int8 value and every level has a summed area table (2D prefix sums),
+    so an occupied area of any rectangle is computed from four lookups.
+    Arrays are stored per level and shared between copies (copy-on-write): a level is copied only when it is modified.
+    """
+    LEVEL_ARRAYS = ("occupancy", "summed_area_table")   # names of attributes with lists of per level arrays
+
+    def __init__(self, levels_nr, length, width):
+        """
+        Constructor.
+        :param levels_nr: number of levels in the height axis
+        :param length: length of the grid
+        :param width: width of the grid
+        """
+        self.levels_nr = levels_nr  # number of levels in the height axis
+        self.length = length        # length of the grid
+        self.width = width          # width of the grid
+
+        # all levels share one empty array until they are modified
+        self.occupancy = [np.zeros(shape=(length, width), dtype=np.int8)] * levels_nr   # maps of occupancy of levels
+        self.summed_area_table = [np.zeros(shape=(length + 1, width + 1),
+                                           dtype=np.int32)] * levels_nr                 # 2D prefix sums of levels
+        self.owned = [False for _ in range(levels_nr)]      # (bool) if arrays of a level are not shared
+
+    def copy(self):
+        """
+        Return a copy of the occupancy map. Arrays are shared until they are modified in one of the maps.
+        :return: a copy of the occupancy map
+        """
+        the_map = copy.copy(self)
+        for name in self.LEVEL_ARRAYS:
+            setattr(the_map, name, getattr(self, name).copy())
+        self.owned = [False for _ in range(self.levels_nr)]
+        the_map.owned = [False for _ in range(self.levels_nr)]
+        return the_map
+
+    def _make_writable(self, height_level):
+        """
+        Private method.
+        Copy arrays of a given level if they are shared with another map.
+        :param height_level: a height level
+        :return:
+        """
+        if not self.owned[height_level]:
+            for name in self.LEVEL_ARRAYS:
+                arrays = getattr(self, name)
+                arrays[height_level] = arrays[height_level].copy()
+            self.owned[height_level] = True
+
+    def set_level(self, height_level, the_map, other_height_level):
+        """
+        Replace a given level with a level of another map of the same type. Arrays are shared (copy-on-write).
+        :param height_level: a height level of this map
+        :param the_map: another map
+        :param other_height_level: a height level of another map
+        :return:
+        """
+        for name in self.LEVEL_ARRAYS:
+            getattr(self, name)[height_level] = getattr(the_map, name)[other_height_level]
+        self.owned[height_level] = False
+        the_map.owned[other_height_level] = False
+
+    def __len__(self):
+        """
+        Get a number of levels. Used when call len(occupancy map).
+        :return: a number of levels
+        """
+        return self.levels_nr
+
+    def __getitem__(self, height_level):
+        """
+        Get a dense map of a single level. Used when call occupancy_map[height_level].
+        :param height_level: a height level
+        :return: a 2D array; 0 if unoccupied, 1 if occupied
+        """
+        return self.get_level_map(height_level)
+
+    def get_level_map(self, height_level):
+        """
+        Get a dense map of a single level.
+        :param height_level: a height level
+        :return: a 2D array; 0 if unoccupied, 1 if occupied
+        """
+        return self.occupancy[height_level]
+
+    def to_array(self):
+        """
+        Get a dense map of all levels.
+        :return: a 3D array (levels number x length x width); 0 if unoccupied, 1 if occupied
+        """
+        return np.stack([self.get_level_map(h) for h in range(self.levels_nr)])
+
+    def get_nbytes(self):
+        """
+        Get a number of bytes used by arrays of the occupancy map.
+        :return: a number of bytes
+        """
+        arrays = {id(x): x for name in self.LEVEL_ARRAYS for x in getattr(self, name)}
+        return sum(x.nbytes for x in arrays.values())
+
+    def fill(self, height_level, length1, length2, width1, width2, value=1):
+        """
+        Mark a rectangle on a given level as occupied (value=1) or unoccupied (value=0).
+        The rectangle has to be fully unoccupied (if value=1) or fully occupied (if value=0).
+        :param height_level: a height level
+        :param length1: lower bound of the rectangle in the length axis (inclusive)
+        :param length2: upper bound of the rectangle in the length axis (exclusive)
+        :param width1: lower bound of the rectangle in the width axis (inclusive)
+        :param width2: upper bound of the rectangle in the width axis (exclusive)
+        :param value: 1 if occupy, 0 if release the rectangle
+        :return:
+        """
+        self._make_writable(height_level)
+        self.occupancy[height_level][length1:length2, width1:width2] = value
+        # a prefix sum at (l, w) changes by the area of the intersection of the rectangle with [0, l) x [0, w)
+        length_steps = np.minimum(np.arange(1, self.length - length1 + 1), length2 - length1)
+        width_steps = np.minimum(np.arange(1, self.width - width1 + 1), width2 - width1)
+        sign = 1 if value else -1
+        self.summed_area_table[height_level][length1 + 1:, width1 + 1:] += \
+            sign * np.outer(length_steps, width_steps).astype(np.int32)
+
+    def clear(self, height_level, length1, length2, width1, width2):
+        """
+        Mark a fully occupied rectangle on a given level as unoccupied.
+        :param height_level: a height level
+        :param length1: lower bound of the rectangle in the length axis (inclusive)
+        :param length2: upper bound of the rectangle in the length axis (exclusive)
+        :param width1: lower bound of the rectangle in the width axis (inclusive)
+        :param width2: upper bound of the rectangle in the width axis (exclusive)
+        :return:
+        """
+        self.fill(height_level, length1, length2, width1, width2, value=0)
+
+    def get_occupied_area(self, height_level, length1, length2, width1, width2):
+        """
+        Get a number of occupied cells in a rectangle on a given level.
+        :param height_level: a height level
+        :param length1: lower bound of the rectangle in the length axis (inclusive)
+        :param length2: upper bound of the rectangle in the length axis (exclusive)
+        :param width1: lower bound of the rectangle in the width axis (inclusive)
+        :param width2: upper bound of the rectangle in the width axis (exclusive)
+        :return: a number of occupied cells in the rectangle
+        """
+        table = self.summed_area_table[height_level]
+        return int(table[length2, width2] - table[length1, width2] - table[length2, width1] + table[length1, width1])
+
+    def get_projection(self, height_level, length, width, axis):
+        """
+        Project a point on a given level toward 0 along a given axis until it touches an occupied cell.
+        :param height_level: a height level
+        :param length: a position in the length axis
+        :param width: a position in the width axis
+        :param axis: 0 if project along the length axis, 1 if along the width axis
+        :return: the lowest position in the axis such that cells between it and the point (exclusive) are unoccupied
+        """
+        level_map = self.occupancy[height_level]
+        line = level_map[:length, width] if axis == 0 else level_map[length, :width]
+        occupied = np.flatnonzero(line)
+        return int(occupied[-1]) + 1 if len(occupied) > 0 else 0
+
+    def _get_summed_area_table(self, height_level, length1=0, width1=0):
+        """
+        Private method.
+        Get a summed area table of a part of a given level starting at (length1, width1). Only differences of its
+        values are used (they are areas of rectangles inside the part).
+        :param height_level: a height level
+        :param length1: the lowest position in the length axis
+        :param width1: the lowest position in the width axis
+        :return: a 2D array with shape (length + 1 - length1, width + 1 - width1)
+        """
+        return self.summed_area_table[height_level][length1:, width1:]
+
+    @staticmethod
+    def _get_prefix_sums(level_map):
+        """
+        Private method.
+        Compute a summed area table of a dense map.
+        :param level_map: a 2D array
+        :return: a 2D array with shape bigger by 1 in both axes (the first row and column are zeros)
+        """
+        table = np.zeros(shape=(level_map.shape[0] + 1, level_map.shape[1] + 1), dtype=np.int32)
+        table[1:, 1:] = np.cumsum(np.cumsum(level_map, axis=0, dtype=np.int32), axis=1)
+        return table
+
+    def get_occupied_areas(self, height_level, lengths1, lengths2, widths1, widths2):
+        """
+        Get numbers of occupied cells in many rectangles on a given level at once.
+        :param height_level: a height level
+        :param lengths1: an array of lower bounds of rectangles in the length axis (inclusive)
+        :param lengths2: an array of upper bounds of rectangles in the length axis (exclusive)
+        :param widths1: an array of lower bounds of rectangles in the width axis (inclusive)
+        :param widths2: an array of upper bounds of rectangles in the width axis (exclusive)
+        :return: an array of numbers of occupied cells in the rectangles
+        """
+        table = self._get_summed_area_table(height_level)
+        return table[lengths2, widths2] - table[lengths1, widths2] - table[lengths2, widths1] + table[lengths1, widths1]
+
+    def get_window_areas(self, height_level, length, width, length1=0, width1=0):
+        """
+        Get numbers of occupied cells in all windows of a given size on a given level (sliding window sums computed
+        from the summed area table in one pass).
+        :param height_level: a height level
+        :param length: a window length
+        :param width: a window width
+        :param length1: the lowest position of windows in the length axis
+        :param width1: the lowest position of windows in the width axis
+        :return: an array with shape (grid length - length + 1 - length1, grid width - width + 1 - width1); a value
+                 at (l, w) is a number of occupied cells in the window with the lower corner at (length1 + l, width1 + w)
+        """
+        table = self._get_summed_area_table(height_level, length1, width1)
+        return table[length:, width:] - table[:table.shape[0] - length, width:] \
+            - table[length:, :table.shape[1] - width] + table[:table.shape[0] - length, :table.shape[1] - width]
+
+
+class BitPackedOccupancyMap(OccupancyMap):
+    """
+    Class used for storing occupancy of a ship grid (a bit-packed backend).
+    Every row of every level is packed to bytes (one bit per cell, see np.packbits), so the map uses about 8 times
+    less memory than a dense map and is copied faster. Areas of rectangles are computed with bitwise AND and popcount
+    of packed rows. Sliding window sums are computed from rows unpacked only for a query and they are not stored.
+    """
+    LEVEL_ARRAYS = ("rows",)
+    POPCOUNT = np.array([bin(x).count("1") for x in range(256)], dtype=np.uint8)   # number of set bits in a byte
+
+    def __init__(self, levels_nr, length, width):
+        """
+        Constructor.
+        :param levels_nr: number of levels in the height axis
+        :param length: length of the grid
+        :param width: width of the grid
+        """
+        self.levels_nr = levels_nr  # number of levels in the height axis
+        self.length = length        # length of the grid
+        self.width = width          # width of the grid
+
+        # all levels share one empty array until they are modified
+        self.rows = [np.zeros(shape=(length, (width + 7) // 8),
+                              dtype=np.uint8)] * levels_nr      # packed rows of levels; a bit is 1 if a cell is occupied
+        self.owned = [False for _ in range(levels_nr)]          # (bool) if arrays of a level are not shared
+
+    def get_level_map(self, height_level):
+        """
+        Get a dense map of a single level.
+        :param height_level: a height level
+        :return: a 2D array; 0 if unoccupied, 1 if occupied
+        """
+        return np.unpackbits(self.rows[height_level], axis=1, count=self.width).astype(np.int8)
+
+    def _get_row_mask(self, width1, width2):
+        """
+        Private method.
+        Get a packed row with bits set in range [width1, width2).
+        :param width1: lower bound in the width axis (inclusive)
+        :param width2: upper bound in the width axis (exclusive)
+        :return: a packed row (1D array of uint8)
+        """
+        bits = np.zeros(shape=self.rows[0].shape[1] * 8, dtype=bool)
+        bits[width1:width2] = True
+        return np.packbits(bits)
+
+    def fill(self, height_level, length1, length2, width1, width2, value=1):
+        """
+        Mark a rectangle on a given level as occupied (value=1) or unoccupied (value=0).
+        :param height_level: a height level
+        :param length1: lower bound of the rectangle in the length axis (inclusive)
+        :param length2: upper bound of the rectangle in the length axis (exclusive)
+        :param width1: lower bound of the rectangle in the width axis (inclusive)
+        :param width2: upper bound of the rectangle in the width axis (exclusive)
+        :param value: 1 if occupy, 0 if release the rectangle
+        :return:
+        """
+        self._make_writable(height_level)
+        mask = self._get_row_mask(width1, width2)
+        if value:
+            self.rows[height_level][length1:length2] |= mask
+        else:
+            self.rows[height_level][length1:length2] &= ~mask
+
+    def get_occupied_area(self, height_level, length1, length2, width1, width2):
+        """
+        Get a number of occupied cells in a rectangle on a given level.
+        :param height_level: a height level
+        :param length1: lower bound of the rectangle in the length axis (inclusive)
+        :param length2: upper bound of the rectangle in the length axis (exclusive)
+        :param width1: lower bound of the rectangle in the width axis (inclusive)
+        :param width2: upper bound of the rectangle in the width axis (exclusive)
+        :return: a number of occupied cells in the rectangle
+        """
+        mask = self._get_row_mask(width1, width2)
+        return int(np.sum(self.POPCOUNT[self.rows[height_level][length1:length2] & mask], dtype=np.int64))
+
+    def get_projection(self, height_level, length, width, axis):
+        """
+        Project a point on a given level toward 0 along a given axis until it touches an occupied cell.
+        Only bits of the crossed row or column are unpacked.
+        :param height_level: a height level
+        :param length: a position in the length axis
+        :param width: a position in the width axis
+        :param axis: 0 if project along the length axis, 1 if along the width axis
+        :return: the lowest position in the axis such that cells between it and the point (exclusive) are unoccupied
+        """
+        if axis == 0:
+            line = (self.rows[height_level][:length, width // 8] >> (7 - width % 8)) & 1
+        else:
+            line = np.unpackbits(self.rows[height_level][length], count=width)
+        occupied = np.flatnonzero(line)
+        return int(occupied[-1]) + 1 if len(occupied) > 0 else 0
+
+    def _get_summed_area_table(self, height_level, length1=0, width1=0):
+        """
+        Private method.
+        Get a summed area table of a part of a given level starting at (length1, width1). Only rows of the part
+        are unpacked and the table is not stored.
+        :param height_level: a height level
+        :param length1: the lowest position in the length axis
+        :param width1: the lowest position in the width axis
+        :return: a 2D array with shape (length + 1 - length1, width + 1 - width1)
+        """
+        bits = np.unpackbits(self.rows[height_level][length1:], axis=1, count=self.width)[:, width1:]
+        return self._get_prefix_sums(bits)
+
+
+class SparseOccupancyMap(OccupancyMap):
+    """
+    Class used for storing occupancy of a ship grid (a sparse backend).
+    Every level is stored as a list of occupied rectangles (length1, length2, width1, width2) sorted by length1,
+    so memory and costs of area queries depend on a number of containers, not on an area of a ship.
+    Rectangles overlapping a query in the length axis are found as a range of the sorted list, because no rectangle
+    is longer than the longest one added so far.
+    Dense level maps and sliding window sums are built on demand from rectangles and they are not stored,
+    so placement strategies based on candidate positions (free_rectangles, extreme_points) should be used
+    for very large ships.
+    """
+    LEVEL_ARRAYS = ("rectangles",)
+
+    def __init__(self, levels_nr, length, width):
+        """
+        Constructor.
+        :param levels_nr: number of levels in the height axis
+        :param length: length of the grid
+        :param width: width of the grid
+        """
+        self.levels_nr = levels_nr  # number of levels in the height axis
+        self.length = length        # length of the grid
+        self.width = width          # width of the grid
+
+        # all levels share one empty list until they are modified
+        self.rectangles = [SortedList()] * levels_nr            # sorted lists of occupied rectangles of levels
+        self.owned = [False for _ in range(levels_nr)]          # (bool) if lists of a level are not shared
+        self.max_length = 0                                     # the longest rectangle added (an upper bound)
+
+    def set_level(self, height_level, the_map, other_height_level):
+        """
+        Replace a given level with a level of another map of the same type. Lists are shared (copy-on-write).
+        :param height_level: a height level of this map
+        :param the_map: another map
+        :param other_height_level: a height level of another map
+        :return:
+        """
+        super().set_level(height_level, the_map, other_height_level)
+        self.max_length = max(self.max_length, the_map.max_length)
+
+    def get_level_map(self, height_level):
+        """
+        Get a dense map of a single level.
+        :param height_level: a height level
+        :return: a 2D array; 0 if unoccupied, 1 if occupied
+        """
+        level_map = np.zeros(shape=(self.length, self.width), dtype=np.int8)
+        for length1, length2, width1, width2 in self.rectangles[height_level]:
+            level_map[length1:length2, width1:width2] = 1
+        return level_map
+
+    def get_nbytes(self):
+        """
+        Get an approximate number of bytes used by lists of the occupancy map (4 ints of 8 bytes per rectangle).
+        :return: a number of bytes
+        """
+        lists = {id(x): x for x in self.rectangles}
+        return sum(32 * len(x) for x in lists.values())
+
+    def fill(self, height_level, length1, length2, width1, width2, value=1):
+        """
+        Mark a rectangle on a given level as occupied (value=1) or unoccupied (value=0).
+        The rectangle has to be fully unoccupied (if value=1) or has to be added before (if value=0).
+        :param height_level: a height level
+        :param length1: lower bound of the rectangle in the length axis (inclusive)
+        :param length2: upper bound of the rectangle in the length axis (exclusive)
+        :param width1: lower bound of the rectangle in the width axis (inclusive)
+        :param width2: upper bound of the rectangle in the width axis (exclusive)
+        :param value: 1 if occupy, 0 if release the rectangle
+        :return:
+        """
+        self._make_writable(height_level)
+        rectangle = (int(length1), int(length2), int(width1), int(width2))
+        if value:
+            self.rectangles[height_level].add(rectangle)
+            self.max_length = max(self.max_length, rectangle[1] - rectangle[0])
+        else:
+            self.rectangles[height_level].remove(rectangle)
+
+    def get_occupied_area(self, height_level, length1, length2, width1, width2):
+        """
+        Get a number of occupied cells in a rectangle on a given level.
+        :param height_level: a height level
+        :param length1: lower bound of the rectangle in the length axis (inclusive)
+        :param length2: upper bound of the rectangle in the length axis (exclusive)
+        :param width1: lower bound of the rectangle in the width axis (inclusive)
+        :param width2: upper bound of the rectangle in the width axis (exclusive)
+        :return: a number of occupied cells in the rectangle
+        """
+        area = 0
+        for l1, l2, w1, w2 in self.rectangles[height_level].irange((length1 - self.max_length + 1,), (length2,),
+                                                                   inclusive=(True, False)):
+            if l2 > length1 and w1 < width2 and w2 > width1:
+                area += (min(l2, length2) - max(l1, length1)) * (min(w2, width2) - max(w1, width1))
+        return area
+
+    def get_occupied_areas(self, height_level, lengths1, lengths2, widths1, widths2):
+        """
+        Get numbers of occupied cells in many rectangles on a given level.
+        :param height_level: a height level
+        :param lengths1: an array of lower bounds of rectangles in the length axis (inclusive)
+        :param lengths2: an array of upper bounds of rectangles in the length axis (exclusive)
+        :param widths1: an array of lower bounds of rectangles in the width axis (inclusive)
+        :param widths2: an array of upper bounds of rectangles in the width axis (exclusive)
+        :return: an array of numbers of occupied cells in the rectangles
+        """
+        return np.array([self.get_occupied_area(height_level, *x)
+                         for x in zip(lengths1, lengths2, widths1, widths2)], dtype=np.int64)
+
+    def get_projection(self, height_level, length, width, axis):
+        """
+        Project a point on a given level toward 0 along a given axis until it touches an occupied cell.
+        Far edges of rectangles crossed by the projection are compared, so no dense level map is built.
+        :param height_level: a height level
+        :param length: a position in the length axis
+        :param width: a position in the width axis
+        :param axis: 0 if project along the length axis, 1 if along the width axis
+        :return: the lowest position in the axis such that cells between it and the point (exclusive) are unoccupied
+        """
+        position = 0
+        if axis == 0:
+            for l1, l2, w1, w2 in self.rectangles[height_level].irange(maximum=(length,), inclusive=(True, False)):
+                if w1 <= width < w2:
+                    position = max(position, min(l2, length))
+        else:
+            for l1, l2, w1, w2 in self.rectangles[height_level].irange((length - self.max_length + 1,), (length + 1,),
+                                                                       inclusive=(True, False)):
+                if l1 <= length < l2 and w1 < width:
+                    position = max(position, min(w2, width))
+        return position
+
+    def _get_summed_area_table(self, height_level, length1=0, width1=0):
+        """
+        Private method.
+        Get a summed area table of a part of a given level starting at (length1, width1). Rectangles overlapping
+        the part are clipped and their corners are accumulated in a difference array, so no dense level map is built
+        with slicing. The table is not stored.
+        :param height_level: a height level
+        :param length1: the lowest position in the length axis
+        :param width1: the lowest position in the width axis
+        :return: a 2D array with shape (length + 1 - length1, width + 1 - width1)
+        """
+        diff = np.zeros(shape=(self.length + 1 - length1, self.width + 1 - width1), dtype=np.int32)
+        rectangles = np.array(self.rectangles[height_level], dtype=np.int64).reshape((-1, 4))
+        rectangles = rectangles[(rectangles[:, 1] > length1) & (rectangles[:, 3] > width1)]
+        l1 = np.maximum(rectangles[:, 0] - length1, 0)
+        l2 = rectangles[:, 1] - length1
+        w1 = np.maximum(rectangles[:, 2] - width1, 0)
+        w2 = rectangles[:, 3] - width1
+        np.add.at(diff, (l1, w1), 1)
+        np.add.at(diff, (l1, w2), -1)
+        np.add.at(diff, (l2, w1), -1)
+        np.add.at(diff, (l2, w2), 1)
+        return self._get_prefix_sums(np.cumsum(np.cumsum(diff, axis=0), axis=1)[:-1, :-1])
+
+
+class OccupancyMapSelector:
+    """
+    Class used for choosing an occupancy map backend.
+    """
+    @staticmethod
+    def select(occupancy_map_type, levels_nr, length, width):
+        """
+        Return a new occupancy map of a given type.
+        :param occupancy_map_type: a name of an occupancy map type (correct_types() return a list of correct names)
+        :param levels_nr: number of levels in the height axis
+        :param length: length of the grid
+        :param width: width of the grid
+        :return: a new occupancy map
+        """
+        occupancy_maps = {"dense": OccupancyMap,
+                          "bitpacked": BitPackedOccupancyMap,
+                          "sparse": SparseOccupancyMap}
+        return occupancy_maps[occupancy_map_type](levels_nr=levels_nr, length=length, width=width)
+
+    @staticmethod
+    def correct_types():
+        """
+        Return a list of correct names of occupancy map types.
+        :return: a list of correct names of occupancy map types
+        """
+        return ["dense", "bitpacked", "sparse"]
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,92 @@
+import numpy as np
+from optimizer_module.occupancy_map_file import OccupancyMap, BitPackedOccupancyMap, SparseOccupancyMap, \
+    OccupancyMapSelector
+
+
+def test_backends_equivalence():
+    """ We fill and clear the same rectangles in a dense, a bit-packed and a sparse map with width not divisible
+        by 8. Level maps, areas of rectangles, sliding window sums and projections of points have to be the same
+        in all backends.
+        Compact backends do not keep dense summed area tables. """
+
+    dense = OccupancyMapSelector.select("dense", levels_nr=2, length=7, width=13)
+    packed = OccupancyMapSelector.select("bitpacked", levels_nr=2, length=7, width=13)
+    sparse = OccupancyMapSelector.select("sparse", levels_nr=2, length=7, width=13)
+    assert type(dense) is OccupancyMap
+    assert type(packed) is BitPackedOccupancyMap
+    assert type(sparse) is SparseOccupancyMap
+
+    rectangles = [(0, 0, 3, 0, 9), (0, 3, 7, 9, 13), (1, 2, 5, 4, 12), (0, 5, 6, 0, 2)]
+    for the_map in [dense, packed, sparse]:
+        for rectangle in rectangles:
+            the_map.fill(*rectangle)
+        the_map.clear(*rectangles[1])
+
+    for the_map in [packed, sparse]:
+        assert np.array_equal(dense.to_array(), the_map.to_array())
+        assert np.array_equal(dense[1], the_map[1])
+        for h in range(2):
+            for length1, length2, width1, width2 in [(0, 7, 0, 13), (1, 4, 7, 11), (4, 6, 0, 1), (2, 2, 3, 5)]:
+                expected = int(np.sum(dense.to_array()[h, length1:length2, width1:width2]))
+                assert dense.get_occupied_area(h, length1, length2, width1, width2) == expected
+                assert the_map.get_occupied_area(h, length1, length2, width1, width2) == expected
+            assert np.array_equal(dense.get_window_areas(h, 3, 4), the_map.get_window_areas(h, 3, 4))
+            assert np.array_equal(dense.get_window_areas(h, 2, 3, 3, 5), the_map.get_window_areas(h, 2, 3, 3, 5))
+            assert dense.get_projection(0, 4, 5, 0) == 3 and dense.get_projection(0, 5, 13, 1) == 2
+            for length in range(7):
+                for width in range(13):
+                    for axis in range(2):
+                        assert dense.get_projection(h, length, width, axis) == \
+                               the_map.get_projection(h, length, width, axis)
+        # window sums are computed from the compact form, so no dense table is kept
+        assert not hasattr(the_map, "summed_area_table")
+
+
+def test_copy_on_write():
+    """ Copies of maps share arrays of levels until a level is modified, then they are independent.
+        A bit-packed map with all levels modified is at least 8 times smaller than a dense one. """
+
+    for the_map in [OccupancyMap(levels_nr=10, length=100, width=100),
+                    BitPackedOccupancyMap(levels_nr=10, length=100, width=100)]:
+        empty_nbytes = the_map.get_nbytes()
+        the_map.fill(0, 0, 10, 0, 10)
+        assert the_map.get_nbytes() == 2 * empty_nbytes
+        map_copy = the_map.copy()
+        level_arrays = getattr(the_map, the_map.LEVEL_ARRAYS[0])
+        copy_level_arrays = getattr(map_copy, the_map.LEVEL_ARRAYS[0])
+        assert copy_level_arrays[0] is level_arrays[0]
+        map_copy.clear(0, 0, 10, 0, 10)
+        map_copy.fill(1, 0, 10, 0, 10)
+        assert the_map.get_occupied_area(0, 0, 100, 0, 100) == 100
+        assert the_map.get_occupied_area(1, 0, 100, 0, 100) == 0
+        assert map_copy.get_occupied_area(0, 0, 100, 0, 100) == 0
+        assert map_copy.get_occupied_area(1, 0, 100, 0, 100) == 100
+        assert copy_level_arrays[0] is not level_arrays[0]
+        assert copy_level_arrays[2] is level_arrays[2]
+
+    dense = OccupancyMap(levels_nr=10, length=100, width=100)
+    packed = BitPackedOccupancyMap(levels_nr=10, length=100, width=100)
+    for h in range(10):
+        dense.fill(h, 0, 1, 0, 1)
+        packed.fill(h, 0, 1, 0, 1)
+    assert dense.get_nbytes() / packed.get_nbytes() > 8
+
+
+def test_sparse_map():
+    """ A sparse map of a 5000 x 5000 ship uses memory proportional to a number of rectangles. Areas of rectangles
+        overlapping many stored ones are correct, also after a copy is modified. """
+
+    the_map = SparseOccupancyMap(levels_nr=3, length=5000, width=5000)
+    for i in range(100):
+        the_map.fill(0, 50 * i, 50 * i + 40, 0, 30)
+    assert the_map.get_nbytes() == 100 * 32
+    assert the_map.get_occupied_area(0, 0, 5000, 0, 5000) == 100 * 40 * 30
+    assert the_map.get_occupied_area(0, 45, 130, 10, 20) == 10 * (40 + 30)
+
+    map_copy = the_map.copy()
+    map_copy.clear(0, 50, 90, 0, 30)
+    map_copy.fill(1, 0, 4000, 0, 10)
+    assert the_map.get_occupied_area(0, 45, 130, 10, 20) == 10 * (40 + 30)
+    assert map_copy.get_occupied_area(0, 45, 130, 10, 20) == 10 * 30
+    assert map_copy.get_occupied_area(1, 3990, 4010, 5, 15) == 10 * 5
+    assert the_map.get_occupied_area(1, 0, 5000, 0, 5000) == 0
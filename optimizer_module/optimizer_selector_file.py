@@ -2,6 +2,7 @@ from .abstract_optimizer_file import IOptimizer
 from .fast_optimizer_file import FastOptimizer
 from .greedy_optimizer_file import GreedyOptimizer
 from .genetic_optimizer_file import GeneticOptimizer
+from .multi_resolution_optimizer_file import MultiResolutionOptimizer
 
 
 class OptimizerSelector:
@@ -9,14 +10,15 @@ class OptimizerSelector:
     Class used for choosing an instance of an optimizer class.
     """
     @staticmethod
-    def select(nr=1):
+    def select(nr=1, **args):
         """
         Return an instance of an optimizer class based on a given number.
         :param nr: a number for an optimizer class (correct_algorithms_ids() return a list of correct numbers)
+        :param args: an optional dictionary used for changing default settings of the optimizer
         :return: an instance of an optimizer class
         """
-        optimizers = [IOptimizer, FastOptimizer, GreedyOptimizer, GeneticOptimizer]
-        return optimizers[nr]()
+        optimizers = [IOptimizer, FastOptimizer, GreedyOptimizer, GeneticOptimizer, MultiResolutionOptimizer]
+        return optimizers[nr](**args)
 
     @staticmethod
     def correct_algorithms_ids():
@@ -24,4 +26,4 @@ class OptimizerSelector:
         Return a list of correct numbers for an optimizer class.
         :return: a list of correct numbers for an optimizer class
         """
-        return [1, 2, 3]
+        return [1, 2, 3, 4]
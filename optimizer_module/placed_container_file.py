@@ -6,25 +6,46 @@ class PlacedContainer:
     """
     Class used for storing information about a container and its position.
     """
-    def __init__(self, container, corner1):
+    __slots__ = ("container", "corner1", "corner2", "rotated")
+
+    def __init__(self, container, corner1, rotated=False):
         """
         Constructor.
         :param container: a container
         :param corner1: a corner position with lower length, width and height_level
+        :param rotated: (bool) if True, the container is rotated by 90 degrees (its length is along the ship width)
         """
         self.container = container                                                  # a container
         self.corner1 = corner1                                                      # the first corner position
-        self.corner2 = CornerPosition(length=corner1.length + container.length,     # the second corner position
-                                      width=corner1.width + container.width,
+        self.rotated = rotated                                                      # (bool) if rotated by 90 degrees
+        self.corner2 = CornerPosition(length=corner1.length + self.length,          # the second corner position
+                                      width=corner1.width + self.width,
                                       height_level=corner1.height_level)
 
+    @property
+    def length(self):
+        """
+        Get a size of the placed container in the length axis of a ship.
+        :return: a size in the length axis
+        """
+        return self.container.width if self.rotated else self.container.length
+
+    @property
+    def width(self):
+        """
+        Get a size of the placed container in the width axis of a ship.
+        :return: a size in the width axis
+        """
+        return self.container.length if self.rotated else self.container.width
+
     def __str__(self):
         """
         Create a string from the placed container. Used when call print(placed container).
         :return: A string describing the placed container.
         """
         order = ["height", "length", "width"]
-        return f"Container ({self.container.to_ordered_string(order)}) at ({self.corner1.to_ordered_string(order)})"
+        return f"Container ({self.container.to_ordered_string(order)}) at ({self.corner1.to_ordered_string(order)})" \
+               + (" rotated" if self.rotated else "")
 
     def __repr__(self):
         """
@@ -44,7 +65,8 @@ class PlacedContainer:
         return PlacedContainer(container=self.container,
                                corner1=CornerPosition(length=self.corner1.length + diff_length,
                                                       width=self.corner1.width + diff_width,
-                                                      height_level=self.corner1.height_level + diff_height_level))
+                                                      height_level=self.corner1.height_level + diff_height_level),
+                               rotated=self.rotated)
 
 
 if __name__ == "__main__":
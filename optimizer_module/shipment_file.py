@@ -1,6 +1,8 @@
 import numpy as np
 from .corner_position_file import CornerPosition
 from .placed_container_file import PlacedContainer
+from .occupancy_map_file import OccupancyMapSelector
+from .free_rectangles_file import FreeRectangles
 from containers_module.container_file import Container
 from ships_module.ship_file import Ship
 
@@ -9,23 +11,40 @@ class Shipment:
     """
     Class used for managing a single shipment.
     """
-    def __init__(self, ship, containers_height):
+    def __init__(self, ship, containers_height, occupancy_map_type="dense"):
         """
         Constructor.
         :param ship: a ship (basis of a shipment)
         :param containers_height: constant height of containers
+        :param occupancy_map_type: a name of an occupancy map backend (see OccupancyMapSelector.correct_types())
         """
-        self.ship = ship                            # a ship (basis of a shipment)
-        self.containers_height = containers_height  # constant height of containers
+        self.ship = ship                                # a ship (basis of a shipment)
+        self.containers_height = containers_height      # constant height of containers
+        self.occupancy_map_type = occupancy_map_type    # a name of an occupancy map backend
 
         self.levels_nr = self.ship.height // self.containers_height         # number of levels in the height axis
         self.placed_containers_levels = [[] for _ in range(self.levels_nr)] # list of placed containers divided into height levels
-        self.all_containers = []                                            # list of all containers
-
-        self.occupancy_map = np.zeros(shape=(self.levels_nr,
-                                             self.ship.length,
-                                             self.ship.width),
-                                      dtype=np.int8)                        # map of occupancy; 0 if unoccupied, 1 if occupied
+        self.all_containers = {}                                            # dict of all containers (cid -> container)
+        self.placed_containers_index = {}                                   # dict of all placed containers (cid -> placed container)
+        self.occupied_areas = [0 for _ in range(self.levels_nr)]            # number of occupied cells on every level
+        self.supports = {}                                                  # placed container -> {placed container above: overlap area}
+        self.supported_by = {}                                              # placed container -> {placed container below: overlap area}
+
+        self.occupancy_map = OccupancyMapSelector.select(occupancy_map_type,
+                                                         self.levels_nr,
+                                                         self.ship.length,
+                                                         self.ship.width)   # map of occupancy (see OccupancyMap)
+        self.free_rectangles = [None for _ in range(self.levels_nr)]        # maximal empty rectangles on every level (None if not built)
+        self.extreme_points = [None for _ in range(self.levels_nr)]         # extreme points on every level (None if not built)
+        self.version = 0                                                    # number increased on every modification of the shipment
+        self.failed_placements = set()                                      # placements (any hashable descriptions) which failed at failed_placements_version
+        self.failed_placements_version = 0                                  # version of the shipment when failed_placements were recorded
+        self.first_fit_cursors = {}                                         # (length, width, height level, by width) -> number of checked positions
+        self.unfit_footprints = [[] for _ in range(self.levels_nr)]         # minimal footprints (length, width) without any empty place on every level
+        self.dominance_rejections_nr = 0                                    # number of level scans skipped thanks to unfit_footprints
+        self.largest_empty_lengths = [None for _ in range(self.levels_nr)]  # on every level: array of the longest empty rectangle for every width (None if not built)
+        self.largest_empty_bounds = [None for _ in range(self.levels_nr)]   # on every level: outdated largest_empty_lengths (upper bounds, None if unknown)
+        self.rectangle_rejections_nr = 0                                    # number of level scans skipped thanks to largest_empty_lengths
 
     def copy(self, only_ship=False):
         """
@@ -33,23 +52,34 @@ class Shipment:
         :param only_ship: (bool) if True, return an empty copy with the current ship, else return a full copy
         :return: a copy of the current shipment
         """
-        sh = Shipment(ship=self.ship, containers_height=self.containers_height)
+        sh = Shipment(ship=self.ship, containers_height=self.containers_height,
+                      occupancy_map_type=self.occupancy_map_type)
         if not only_ship:
-            sh.placed_containers_levels = [x.copy() for x in self.placed_containers_levels]
-            sh.all_containers = self.all_containers.copy()
-            sh.occupancy_map = np.copy(self.occupancy_map)
+            sh.load(self)
         return sh
 
     def load(self, shipment):
         """
         Load data from another shipment to this, if the ship is the same.
+        Levels of the occupancy map are shared until they are modified (copy-on-write).
         :param shipment: another.shipment
         :return:
         """
         if self.ship == shipment.ship:
+            self.version += 1
             self.placed_containers_levels = [x.copy() for x in shipment.placed_containers_levels]
             self.all_containers = shipment.all_containers.copy()
-            self.occupancy_map = np.copy(shipment.occupancy_map)
+            self.placed_containers_index = shipment.placed_containers_index.copy()
+            self.occupied_areas = shipment.occupied_areas.copy()
+            self.supports = {k: v.copy() for k, v in shipment.supports.items()}
+            self.supported_by = {k: v.copy() for k, v in shipment.supported_by.items()}
+            self.occupancy_map = shipment.occupancy_map.copy()
+            self.free_rectangles = [None if x is None else x.copy() for x in shipment.free_rectangles]
+            self.extreme_points = [None if x is None else x.copy() for x in shipment.extreme_points]
+            self.first_fit_cursors = {}
+            self.unfit_footprints = [x.copy() for x in shipment.unfit_footprints]
+            self.largest_empty_lengths = shipment.largest_empty_lengths.copy()
+            self.largest_empty_bounds = shipment.largest_empty_bounds.copy()
 
     def to_string(self, get_list=True, get_map=True):
         """
@@ -89,8 +119,8 @@ class Shipment:
         :return: a number of used (non empty) levels.
         """
         max_used_level = 0
-        for level in self.placed_containers_levels:
-            if len(level) == 0:
+        for occupied_area in self.occupied_areas:
+            if occupied_area == 0:
                 break
             else:
                 max_used_level += 1
@@ -112,7 +142,7 @@ class Shipment:
         Get used volume in the shipment.
         :return: used volume in the shipment
         """
-        return np.sum(self.occupancy_map) * self.containers_height
+        return sum(self.occupied_areas) * self.containers_height
 
     def get_empty_volume(self, only_used_levels=False):
         """
@@ -129,7 +159,15 @@ class Shipment:
         Get a list of all containers in the shipment.
         :return: a list of all containers in the shipment
         """
-        return self.all_containers
+        return list(self.all_containers.values())
+
+    def contains(self, container):
+        """
+        Check if a given container is in the shipment.
+        :param container: a container
+        :return: True if a given container is in the shipment, else False
+        """
+        return container.cid in self.all_containers
 
     def get_timestamps_set(self):
         """
@@ -137,7 +175,7 @@ class Shipment:
         :return: a set of timestamps of all containers in the shipment
         """
         timestamps = set()
-        for container in self.get_all_containers():
+        for container in self.all_containers.values():
             timestamps.add(container.timestamp)
         return timestamps
 
@@ -148,7 +186,7 @@ class Shipment:
         :param placed_container: a placed container (a candidate to add to the shipment)
         :return: True if a given container is not in the shipment, else False
         """
-        return placed_container.container not in self.all_containers
+        return not self.contains(placed_container.container)
 
     def _check_if_inside_ship(self, placed_container):
         """
@@ -173,9 +211,9 @@ class Shipment:
         """
         if checked_map is None:
             checked_map = self.occupancy_map
-        occupied_area = np.sum(checked_map[placed_container.corner1.height_level,
-                                           placed_container.corner1.length:placed_container.corner2.length,
-                                           placed_container.corner1.width:placed_container.corner2.width])
+        occupied_area = checked_map.get_occupied_area(placed_container.corner1.height_level,
+                                                      placed_container.corner1.length, placed_container.corner2.length,
+                                                      placed_container.corner1.width, placed_container.corner2.width)
         return occupied_area == 0
 
     def _check_if_stable(self, placed_container, checked_map=None):
@@ -191,11 +229,381 @@ class Shipment:
         else:
             if checked_map is None:
                 checked_map = self.occupancy_map
-            area_below = np.sum(checked_map[placed_container.corner1.height_level - 1,
-                                            placed_container.corner1.length:placed_container.corner2.length,
-                                            placed_container.corner1.width:placed_container.corner2.width])
+            area_below = checked_map.get_occupied_area(placed_container.corner1.height_level - 1,
+                                                       placed_container.corner1.length, placed_container.corner2.length,
+                                                       placed_container.corner1.width, placed_container.corner2.width)
             return area_below >= (placed_container.container.length * placed_container.container.width) / 2
 
+    def get_feasible_positions(self, length, width, height_level=None):
+        """
+        Get a mask of all positions where a container with given dimensions can be placed, i.e. the space is inside
+        the ship, it is unoccupied and the container would be stable. Redundancy is not checked.
+        :param length: a container length
+        :param width: a container width
+        :param height_level: (int) a height level (if None, return masks for all levels)
+        :return: a boolean array with shape (ship length, ship width) (or (levels number, ship length, ship width)
+                 if height_level is None); True at (l, w) if the lower corner of a container can be placed there
+        """
+        if height_level is None:
+            return np.stack([self.get_feasible_positions(length, width, h) for h in range(self.levels_nr)])
+        mask = np.zeros(shape=(self.ship.length, self.ship.width), dtype=bool)
+        if length > self.ship.length or width > self.ship.width:
+            return mask
+        feasible = self._get_feasible_windows(length, width, height_level)
+        mask[:feasible.shape[0], :feasible.shape[1]] = feasible
+        return mask
+
+    def _get_feasible_windows(self, length, width, height_level, length1=0, width1=0):
+        """
+        Private method.
+        Get a mask of positions inside the ship where a container with given dimensions can be placed.
+        :param length: a container length (not greater than the ship length)
+        :param width: a container width (not greater than the ship width)
+        :param height_level: a height level
+        :param length1: the lowest position in the length axis
+        :param width1: the lowest position in the width axis
+        :return: a boolean array with shape (ship length - length + 1 - length1, ship width - width + 1 - width1);
+                 True at (l, w) if the lower corner of a container can be placed at (length1 + l, width1 + w)
+        """
+        if self.unfit_footprints[height_level] and self._check_if_unfit(length, width, height_level):
+            self.dominance_rejections_nr += 1
+            return np.zeros(shape=(self.ship.length - length + 1 - length1, self.ship.width - width + 1 - width1),
+                            dtype=bool)
+        if not self.check_if_may_fit(length, width, height_level):
+            self._add_unfit_footprint(length, width, height_level)
+            self.rectangle_rejections_nr += 1
+            return np.zeros(shape=(self.ship.length - length + 1 - length1, self.ship.width - width + 1 - width1),
+                            dtype=bool)
+        feasible = self.occupancy_map.get_window_areas(height_level, length, width, length1, width1) == 0
+        if not feasible.any():
+            if length1 == 0 and width1 == 0:
+                self._add_unfit_footprint(length, width, height_level)
+            return feasible
+        if height_level > 0:
+            feasible &= self.occupancy_map.get_window_areas(height_level - 1, length, width,
+                                                            length1, width1) >= (length * width) / 2
+        return feasible
+
+    def get_largest_empty_lengths(self, height_level):
+        """
+        Get lengths of the longest empty rectangles of every width on a given level. It is built from histograms
+        of empty cells in O(length * width): a height of a column at (l, w) is a number of empty cells ending at (l, w)
+        in the length axis, and the bar is extended in the width axis between the nearest cells (left and right)
+        which are occupied in any row of the bar. Every maximal empty rectangle is such a bar for some cell.
+        Extents of bars are segmented running maximums (minimums) of nearest occupied cells of rows, computed for all
+        cells at once. Then the longest rectangle of width k is the maximum height of bars not narrower than k.
+        It is built lazily on the first query after the level is modified. The sparse backend has no dense map,
+        so there the lengths are taken from maximal empty rectangles of the level (see get_free_rectangles()).
+        :param height_level: a height level
+        :return: a 1D array; a value at k is the longest length of an empty rectangle with width k + 1 (the array is
+                 shorter than the ship width if there is no empty rectangle of larger width)
+        """
+        if self.largest_empty_lengths[height_level] is None and self.occupied_areas[height_level] == 0:
+            self.largest_empty_lengths[height_level] = np.full(self.ship.width, self.ship.length, dtype=np.int32)
+        elif self.largest_empty_lengths[height_level] is None and self.occupancy_map_type == "sparse":
+            longest = np.zeros(self.ship.width + 1, dtype=np.int32)
+            for length1, length2, width1, width2 in self.get_free_rectangles(height_level).rectangles:
+                longest[width2 - width1] = max(longest[width2 - width1], length2 - length1)
+            longest = np.maximum.accumulate(longest[::-1])[::-1][1:]
+            self.largest_empty_lengths[height_level] = longest[:np.count_nonzero(longest)]
+        elif self.largest_empty_lengths[height_level] is None:
+            empty = self.occupancy_map.get_level_map(height_level) == 0
+            width = self.ship.width
+            counts = np.cumsum(empty, axis=0, dtype=np.int32)
+            heights = counts - np.maximum.accumulate(np.where(empty, 0, counts), axis=0)
+            columns = np.arange(width, dtype=np.int32)
+            # the nearest occupied cells of every row: on the left (+1) and on the right
+            lefts = np.maximum.accumulate(np.where(empty, 0, columns + 1), axis=1)
+            rights = np.minimum.accumulate(np.where(empty, width, columns)[:, ::-1], axis=1)[:, ::-1]
+            lefts = np.where(empty, lefts, 0)
+            rights = np.where(empty, rights, width)
+            # runs of empty cells in a column have increasing ids, so offsets separate running extremes of runs
+            offsets = np.cumsum(~empty, axis=0, dtype=np.int32) * (width + 1)
+            lefts = np.maximum.accumulate(lefts + offsets, axis=0) - offsets
+            rights = np.minimum.accumulate(rights - offsets, axis=0) + offsets
+            longest = np.zeros(width + 1, dtype=np.int32)
+            np.maximum.at(longest, (rights - lefts)[empty], heights[empty])
+            longest = np.maximum.accumulate(longest[::-1])[::-1][1:]
+            self.largest_empty_lengths[height_level] = longest[:np.count_nonzero(longest)]
+        return self.largest_empty_lengths[height_level]
+
+    def check_if_may_fit(self, length, width, height_level):
+        """
+        Check if there can be an empty rectangle for a container with given dimensions on a given level
+        (see get_largest_empty_lengths()). Stability is not checked.
+        The check is O(1): the free area of the level is compared first, then lengths of the longest empty rectangles
+        if they are built, or lengths built before the level was filled (upper bounds). Lengths are never rebuilt here,
+        because a rebuild costs as much as tens of scans of the level and it rejects too few footprints to pay off.
+        :param length: a container length
+        :param width: a container width
+        :param height_level: a height level
+        :return: False if there is surely no empty place for the container, else True
+        """
+        if length * width > self.ship.length * self.ship.width - self.occupied_areas[height_level]:
+            return False
+        lengths = self.largest_empty_lengths[height_level]
+        if lengths is None:
+            lengths = self.largest_empty_bounds[height_level]
+        return lengths is None or (width <= len(lengths) and lengths[width - 1] >= length)
+
+    def _outdate_largest_empty_lengths(self, height_level):
+        """
+        Private method.
+        Mark lengths of the longest empty rectangles on a given level as outdated after containers were added.
+        Adding containers can only shrink empty rectangles, so the last built lengths are kept as upper bounds
+        and a footprint rejected by them is rejected without rebuilding.
+        :param height_level: a height level
+        :return:
+        """
+        if self.largest_empty_lengths[height_level] is not None:
+            self.largest_empty_bounds[height_level] = self.largest_empty_lengths[height_level]
+        self.largest_empty_lengths[height_level] = None
+
+    def _check_if_unfit(self, length, width, height_level):
+        """
+        Private method.
+        Check if a footprint dominates (is not smaller in both dimensions than) a footprint which has no empty place
+        on a given level. Then the footprint has no empty place on the level either, until a container is removed.
+        :param length: a container length
+        :param width: a container width
+        :param height_level: a height level
+        :return: True if there is surely no empty place for the footprint, else False
+        """
+        return any(x[0] <= length and x[1] <= width for x in self.unfit_footprints[height_level])
+
+    def _add_unfit_footprint(self, length, width, height_level):
+        """
+        Private method.
+        Remember that a footprint has no empty place on a given level. Only minimal footprints are kept.
+        :param length: a container length
+        :param width: a container width
+        :param height_level: a height level
+        :return:
+        """
+        self.unfit_footprints[height_level] = [x for x in self.unfit_footprints[height_level]
+                                               if x[0] < length or x[1] < width] + [(length, width)]
+
+    def check_failed_placement(self, placement):
+        """
+        Check if a placement failed since the last modification of the shipment.
+        :param placement: a hashable description of a placement, eg. (strategy, length, width, level, by width)
+        :return: True if the placement failed for the current version of the shipment, else False
+        """
+        return self.failed_placements_version == self.version and placement in self.failed_placements
+
+    def add_failed_placement(self, placement):
+        """
+        Remember that a placement failed for the current version of the shipment. Failures remembered for previous
+        versions are forgotten.
+        :param placement: a hashable description of a placement, eg. (strategy, length, width, level, by width)
+        :return:
+        """
+        if self.failed_placements_version != self.version:
+            self.failed_placements = set()
+            self.failed_placements_version = self.version
+        self.failed_placements.add(placement)
+
+    def find_first_position(self, length, width, height_level=None, by_width=False):
+        """
+        Find a first position where a container with given dimensions can be placed. Positions are ordered by
+        (height level, length, width), or by (width, height level, length) if by_width is True.
+        The number of positions already checked for a footprint is cached (first_fit_cursors), so the next search
+        for the same footprint starts where the previous one ended. Adding a container only makes positions
+        on the level above feasible again, so only cursors covering that level are moved back; removing a container
+        clears the cache.
+        :param length: a container length
+        :param width: a container width
+        :param height_level: (int) a height level (if None, search all levels)
+        :param by_width: (bool) if True, order positions by width first
+        :return: a tuple (height level, length, width) or None if there is no feasible position
+        """
+        found = self._find_first_positions([(length, width)], height_level, by_width)
+        return None if found is None else found[1]
+
+    def find_first_placement(self, length, width, height_level=None, by_width=False, rotation=False):
+        """
+        Find a first position where a container with given dimensions can be placed, optionally rotated by 90 degrees.
+        Both orientations are evaluated in the same scan (see _find_first_positions()) and the earlier position
+        in the search order wins. On a tie the unrotated orientation is preferred.
+        :param length: a container length
+        :param width: a container width
+        :param height_level: (int) a height level (if None, search all levels)
+        :param by_width: (bool) if True, order positions by width first
+        :param rotation: (bool) if True, the rotated footprint (width x length) is also tried
+        :return: a tuple (height level, length, width, rotated) or None if there is no feasible position
+        """
+        footprints = [(length, width), (width, length)] if rotation and length != width else [(length, width)]
+        found = self._find_first_positions(footprints, height_level, by_width)
+        if found is None:
+            return None
+        i, (h, l, w) = found
+        return h, l, w, i == 1
+
+    def _find_first_positions(self, footprints, height_level=None, by_width=False):
+        """
+        Private method.
+        Find a first position where any of given footprints can be placed (see find_first_position()). Every footprint
+        has its own cursor, but levels are scanned once for all of them: the scan stops at the first level
+        (or the first width if by_width is True) where any footprint fits, and the earliest of their positions wins.
+        On a tie the earlier footprint is preferred.
+        :param footprints: a list of tuples (length, width)
+        :param height_level: (int) a height level (if None, search all levels)
+        :param by_width: (bool) if True, order positions by width first
+        :return: a tuple (index of a footprint, (height level, length, width)) or None if there is no feasible position
+        """
+        levels = list(range(self.levels_nr)) if height_level is None else [height_level]
+        searches = []
+        for length, width in footprints:
+            lengths_nr = self.ship.length - length + 1
+            widths_nr = self.ship.width - width + 1
+            if lengths_nr > 0 and widths_nr > 0:
+                key = (length, width, height_level, by_width)
+                searches.append((len(searches), length, width, lengths_nr, widths_nr, key,
+                                 self.first_fit_cursors.get(key, 0)))
+            else:
+                searches.append(None)
+        searches = [x for x in searches if x is not None]
+        best = None
+        best_key = None
+        if by_width:
+            for i, length, width, lengths_nr, widths_nr, key, cursor in searches:
+                w1 = cursor // (len(levels) * lengths_nr)
+                if best_key is not None and w1 > best_key[0]:
+                    continue
+                if w1 < widths_nr:
+                    feasible = np.stack([self._get_feasible_windows(length, width, h, width1=w1) for h in levels])
+                    feasible = feasible.transpose((2, 0, 1)).reshape(-1)
+                    feasible[:cursor - w1 * len(levels) * lengths_nr] = False
+                    if feasible.any():
+                        index = int(np.argmax(feasible))
+                        self.first_fit_cursors[key] = w1 * len(levels) * lengths_nr + index
+                        w, j, l = np.unravel_index(index, (widths_nr - w1, len(levels), lengths_nr))
+                        position = (levels[j], int(l), w1 + int(w))
+                        if best_key is None or (position[2], position[0], position[1]) < best_key:
+                            best = (i, position)
+                            best_key = (position[2], position[0], position[1])
+                        continue
+                self.first_fit_cursors[key] = len(levels) * lengths_nr * widths_nr
+        else:
+            start = min([x[6] // (x[3] * x[4]) for x in searches] + [len(levels)])
+            for j in range(start, len(levels)):
+                for i, length, width, lengths_nr, widths_nr, key, cursor in searches:
+                    level_size = lengths_nr * widths_nr
+                    if cursor >= (j + 1) * level_size:
+                        continue
+                    l1 = max(cursor - j * level_size, 0) // widths_nr
+                    feasible = self._get_feasible_windows(length, width, levels[j], length1=l1).reshape(-1)
+                    feasible[:max(cursor - j * level_size - l1 * widths_nr, 0)] = False
+                    if feasible.any():
+                        index = int(np.argmax(feasible))
+                        self.first_fit_cursors[key] = j * level_size + l1 * widths_nr + index
+                        position = (levels[j], l1 + index // widths_nr, index % widths_nr)
+                        if best is None or position < best[1]:
+                            best = (i, position)
+                    else:
+                        self.first_fit_cursors[key] = (j + 1) * level_size
+                if best is not None:
+                    break
+            if best is None:
+                for i, length, width, lengths_nr, widths_nr, key, cursor in searches:
+                    self.first_fit_cursors[key] = len(levels) * lengths_nr * widths_nr
+        return best
+
+    def _update_first_fit_cursors(self, height_level):
+        """
+        Private method.
+        Move back cursors of first fit searches after adding a container on a given level, because positions
+        on the level above can become feasible (they get support).
+        :param height_level: a height level of an added container
+        :return:
+        """
+        h = height_level + 1
+        if h >= self.levels_nr:
+            return
+        for key in list(self.first_fit_cursors):
+            length, width, single_level, by_width = key
+            if single_level == h or (single_level is None and by_width):
+                del self.first_fit_cursors[key]
+            elif single_level is None:
+                level_start = h * (self.ship.length - length + 1) * (self.ship.width - width + 1)
+                self.first_fit_cursors[key] = min(self.first_fit_cursors[key], level_start)
+
+    def get_free_rectangles(self, height_level):
+        """
+        Get maximal empty rectangles of a given level. They are updated when a container is added and rebuilt
+        from containers of the level after a container is removed.
+        :param height_level: a height level
+        :return: free rectangles of the level
+        """
+        if self.free_rectangles[height_level] is None:
+            free_rectangles = FreeRectangles(self.ship.length, self.ship.width)
+            for placed_container in self.placed_containers_levels[height_level]:
+                free_rectangles.occupy(placed_container.corner1.length, placed_container.corner2.length,
+                                       placed_container.corner1.width, placed_container.corner2.width)
+            self.free_rectangles[height_level] = free_rectangles
+        return self.free_rectangles[height_level]
+
+    def _get_projected_extreme_points(self, placed_container):
+        """
+        Private method.
+        Get extreme points of a given placed container: a point at its far length edge projected toward width 0
+        and a point at its far width edge projected toward length 0. A point is projected until it touches
+        an occupied cell. Points outside the ship are skipped.
+        :param placed_container: a placed container (already added to the occupancy map)
+        :return: a list of tuples (length, width)
+        """
+        h = placed_container.corner1.height_level
+        points = []
+        if placed_container.corner2.length < self.ship.length:
+            points.append((placed_container.corner2.length,
+                           self.occupancy_map.get_projection(h, placed_container.corner2.length,
+                                                             placed_container.corner1.width, axis=1)))
+        if placed_container.corner2.width < self.ship.width:
+            points.append((self.occupancy_map.get_projection(h, placed_container.corner1.length,
+                                                             placed_container.corner2.width, axis=0),
+                           placed_container.corner2.width))
+        return points
+
+    def _add_extreme_points(self, placed_container):
+        """
+        Private method.
+        Update built extreme points after adding a given container: drop points covered by its footprint, add its
+        projected extreme points to its level and its lower corner to the level above (a place where a container
+        would be supported) if it is not occupied there.
+        :param placed_container: an added placed container
+        :return:
+        """
+        h = placed_container.corner1.height_level
+        corner1, corner2 = placed_container.corner1, placed_container.corner2
+        if self.extreme_points[h] is not None:
+            self.extreme_points[h].difference_update([x for x in self.extreme_points[h]
+                                                      if corner1.length <= x[0] < corner2.length and
+                                                      corner1.width <= x[1] < corner2.width])
+            self.extreme_points[h].update(self._get_projected_extreme_points(placed_container))
+        if h + 1 < self.levels_nr and self.extreme_points[h + 1] is not None and \
+                self.occupancy_map.get_occupied_area(h + 1, corner1.length, corner1.length + 1,
+                                                     corner1.width, corner1.width + 1) == 0:
+            self.extreme_points[h + 1].add((corner1.length, corner1.width))
+
+    def get_extreme_points(self, height_level):
+        """
+        Get extreme points of a given level: the origin, projected extreme points of containers on the level and lower
+        corners of containers on the level below. Points are updated when a container is added and rebuilt after
+        a container is removed. Occupied points are dropped.
+        :param height_level: a height level
+        :return: a set of tuples (length, width)
+        """
+        if self.extreme_points[height_level] is None:
+            points = {(0, 0)}
+            for placed_container in self.placed_containers_levels[height_level]:
+                points.update(self._get_projected_extreme_points(placed_container))
+            if height_level > 0:
+                points.update((x.corner1.length, x.corner1.width)
+                              for x in self.placed_containers_levels[height_level - 1])
+            self.extreme_points[height_level] = {x for x in points if self.occupancy_map.get_occupied_area(
+                height_level, x[0], x[0] + 1, x[1], x[1] + 1) == 0}
+        return self.extreme_points[height_level]
+
     @staticmethod
     def _add_to_map(placed_container, the_map):
         """
@@ -205,9 +613,9 @@ class Shipment:
         :param the_map: an occupancy map
         :return:
         """
-        the_map[placed_container.corner1.height_level,
-                placed_container.corner1.length:placed_container.corner2.length,
-                placed_container.corner1.width:placed_container.corner2.width] = 1
+        the_map.fill(placed_container.corner1.height_level,
+                     placed_container.corner1.length, placed_container.corner2.length,
+                     placed_container.corner1.width, placed_container.corner2.width)
 
     @staticmethod
     def _remove_from_map(placed_container, the_map):
@@ -218,9 +626,60 @@ class Shipment:
         :param the_map: an occupancy map
         :return:
         """
-        the_map[placed_container.corner1.height_level,
-                placed_container.corner1.length:placed_container.corner2.length,
-                placed_container.corner1.width:placed_container.corner2.width] = 0
+        the_map.clear(placed_container.corner1.height_level,
+                      placed_container.corner1.length, placed_container.corner2.length,
+                      placed_container.corner1.width, placed_container.corner2.width)
+
+    @staticmethod
+    def _get_overlap_area(placed_container1, placed_container2):
+        """
+        Private method.
+        Get an area of overlapping of projections of two placed containers on the ground.
+        :param placed_container1: a placed container
+        :param placed_container2: a placed container
+        :return: an overlap area
+        """
+        length = min(placed_container1.corner2.length, placed_container2.corner2.length) - \
+            max(placed_container1.corner1.length, placed_container2.corner1.length)
+        width = min(placed_container1.corner2.width, placed_container2.corner2.width) - \
+            max(placed_container1.corner1.width, placed_container2.corner1.width)
+        return length * width if length > 0 and width > 0 else 0
+
+    def _add_to_support_graph(self, placed_container):
+        """
+        Private method.
+        Add a given container to the support graph: link it with overlapping containers on the level below
+        (containers it rests on) and on the level above (containers resting on it).
+        :param placed_container: an added placed container
+        :return:
+        """
+        h = placed_container.corner1.height_level
+        self.supports[placed_container] = {}
+        self.supported_by[placed_container] = {}
+        if h > 0:
+            for below in self.placed_containers_levels[h - 1]:
+                area = self._get_overlap_area(placed_container, below)
+                if area > 0:
+                    self.supported_by[placed_container][below] = area
+                    self.supports[below][placed_container] = area
+        if h + 1 < self.levels_nr:
+            for above in self.placed_containers_levels[h + 1]:
+                area = self._get_overlap_area(placed_container, above)
+                if area > 0:
+                    self.supports[placed_container][above] = area
+                    self.supported_by[above][placed_container] = area
+
+    def _remove_from_support_graph(self, placed_container):
+        """
+        Private method.
+        Remove a given container and all its links from the support graph.
+        :param placed_container: a removed placed container
+        :return:
+        """
+        for above in self.supports.pop(placed_container):
+            del self.supported_by[above][placed_container]
+        for below in self.supported_by.pop(placed_container):
+            del self.supports[below][placed_container]
 
     def _add(self, placed_container):
         """
@@ -230,8 +689,20 @@ class Shipment:
         :return:
         """
         self._add_to_map(placed_container, self.occupancy_map)
+        if self.free_rectangles[placed_container.corner1.height_level] is not None:
+            self.free_rectangles[placed_container.corner1.height_level].occupy(
+                placed_container.corner1.length, placed_container.corner2.length,
+                placed_container.corner1.width, placed_container.corner2.width)
+        self._add_extreme_points(placed_container)
+        self._add_to_support_graph(placed_container)
+        self.occupied_areas[placed_container.corner1.height_level] += \
+            placed_container.container.length * placed_container.container.width
         self.placed_containers_levels[placed_container.corner1.height_level].append(placed_container)
-        self.all_containers.append(placed_container.container)
+        self.all_containers[placed_container.container.cid] = placed_container.container
+        self.placed_containers_index[placed_container.container.cid] = placed_container
+        self._outdate_largest_empty_lengths(placed_container.corner1.height_level)
+        self._update_first_fit_cursors(placed_container.corner1.height_level)
+        self.version += 1
 
     def _remove(self, placed_container):
         """
@@ -241,8 +712,21 @@ class Shipment:
         :return:
         """
         self._remove_from_map(placed_container, self.occupancy_map)
+        self._remove_from_support_graph(placed_container)
+        self.free_rectangles[placed_container.corner1.height_level] = None
+        self.extreme_points[placed_container.corner1.height_level] = None
+        if placed_container.corner1.height_level + 1 < self.levels_nr:
+            self.extreme_points[placed_container.corner1.height_level + 1] = None
+        self.occupied_areas[placed_container.corner1.height_level] -= \
+            placed_container.container.length * placed_container.container.width
         self.placed_containers_levels[placed_container.corner1.height_level].remove(placed_container)
-        self.all_containers.remove(placed_container.container)
+        del self.all_containers[placed_container.container.cid]
+        del self.placed_containers_index[placed_container.container.cid]
+        self.first_fit_cursors = {}
+        self.version += 1
+        self.unfit_footprints[placed_container.corner1.height_level] = []
+        self.largest_empty_lengths[placed_container.corner1.height_level] = None
+        self.largest_empty_bounds[placed_container.corner1.height_level] = None
 
     def check_and_add(self, placed_container):
         """
@@ -264,6 +748,48 @@ class Shipment:
             self._add(placed_container)
         return if_can
 
+    def can_place(self, container, height_level, length, width, rotated=False):
+        """
+        Check if a given container can be safely added to a shipment at a given position (the same conditions as in
+        check_and_add()). No placed container is created.
+        :param container: a container
+        :param height_level: (int) a position of the lower corner in the height axis
+        :param length: (int) a position of the lower corner in the length axis
+        :param width: (int) a position of the lower corner in the width axis
+        :param rotated: (bool) if True, the container is rotated by 90 degrees
+        :return: True if a given container can be added, else False
+        """
+        length2 = length + (container.width if rotated else container.length)
+        width2 = width + (container.length if rotated else container.width)
+        if not (0 <= height_level < self.levels_nr and
+                0 <= length and length2 <= self.ship.length and
+                0 <= width and width2 <= self.ship.width):
+            return False
+        if self.occupancy_map.get_occupied_area(height_level, length, length2, width, width2) != 0:
+            return False
+        if height_level > 0:
+            area_below = self.occupancy_map.get_occupied_area(height_level - 1, length, length2, width, width2)
+            if area_below < (container.length * container.width) / 2:
+                return False
+        return not self.contains(container)
+
+    def place(self, container, height_level, length, width, rotated=False):
+        """
+        Check if a given container can be safely added to a shipment at a given position and if so, add it.
+        A placed container is created only if the container is added.
+        :param container: a container
+        :param height_level: (int) a position of the lower corner in the height axis
+        :param length: (int) a position of the lower corner in the length axis
+        :param width: (int) a position of the lower corner in the width axis
+        :param rotated: (bool) if True, the container is rotated by 90 degrees
+        :return: True if successfully added, else False
+        """
+        if_can = self.can_place(container, height_level, length, width, rotated)
+        if if_can:
+            self._add(PlacedContainer(container, CornerPosition(length=length, width=width,
+                                                                height_level=height_level), rotated))
+        return if_can
+
     def check_and_join(self, shipment):
         """
         Check if all containers from the given shipment can be added to this shipment and if so, add it.
@@ -277,45 +803,118 @@ class Shipment:
         :param shipment: a joined shipment
         :return: True if successfully added, else False
         """
-        if_can = False
-        placed_containers_to_add = []
-        if self.ship == shipment.ship:
-            used_levels_nr = self.get_used_levels_nr()
-            if used_levels_nr + shipment.get_used_levels_nr() <= self.levels_nr:
-                if_can = True
-                for level in shipment.placed_containers_levels:
-                    if not if_can:
-                        break
-                    for placed_container in level:
-                        new_placed_container = placed_container.get_shifted_copy(diff_height_level=used_levels_nr)
-                        if_can_new = self._check_if_stable(placed_container) and \
-                                     self._check_redundancy(placed_container)
-                        if if_can_new:
-                            placed_containers_to_add.append(new_placed_container)
-                        else:
-                            if_can = False
-                            break
-        if if_can:
-            for placed_container in placed_containers_to_add:
-                self._add(placed_container)
-        return if_can
+        if self.ship != shipment.ship:
+            return False
+        used_levels_nr = self.get_used_levels_nr()
+        joined_levels_nr = shipment.get_used_levels_nr()
+        if used_levels_nr + joined_levels_nr > self.levels_nr:
+            return False
+        if not self.all_containers.keys().isdisjoint(shipment.all_containers.keys()):
+            return False
+        if not self.check_if_supports(shipment):
+            return False
+        if joined_levels_nr > 0:
+            self._add_levels(shipment, used_levels_nr, joined_levels_nr)
+        return True
+
+    def check_if_supports(self, shipment):
+        """
+        Check if all containers of the bottom level of a given shipment would be stable on the top used level
+        of this shipment (containers on the upper levels of the given shipment are stable on its bottom level).
+        If this shipment is empty, the floor supports everything.
+        :param shipment: a shipment based on a ship with the same length and width
+        :return: True if all containers would be stable, else False
+        """
+        used_levels_nr = self.get_used_levels_nr()
+        if used_levels_nr == 0 or shipment.get_used_levels_nr() == 0:
+            return True
+        bottom = self._get_rectangles(shipment.placed_containers_levels[0])
+        areas_below = self.occupancy_map.get_occupied_areas(used_levels_nr - 1,
+                                                            bottom[:, 0], bottom[:, 1], bottom[:, 2], bottom[:, 3])
+        return bool(np.all(areas_below >= (bottom[:, 1] - bottom[:, 0]) * (bottom[:, 3] - bottom[:, 2]) / 2))
+
+    @staticmethod
+    def _get_rectangles(placed_containers):
+        """
+        Private method.
+        Get an array of projections of given placed containers on the ground.
+        :param placed_containers: a list of placed containers
+        :return: an array with shape (containers number, 4); rows are (length1, length2, width1, width2)
+        """
+        return np.array([[x.corner1.length, x.corner2.length, x.corner1.width, x.corner2.width]
+                         for x in placed_containers], dtype=np.int64).reshape((-1, 4))
+
+    def _add_levels(self, shipment, first_level, levels_nr):
+        """
+        Private method.
+        Add the lowest levels of another shipment above the used levels of this shipment (without checking).
+        Levels of the occupancy map are shared, lists and indexes are extended in bulk.
+        :param shipment: another shipment
+        :param first_level: a first level of this shipment to fill
+        :param levels_nr: a number of levels to add
+        :return:
+        """
+        shifted = {}
+        for k in range(levels_nr):
+            h = first_level + k
+            level = [x.get_shifted_copy(diff_height_level=first_level) for x in shipment.placed_containers_levels[k]]
+            shifted.update(zip(shipment.placed_containers_levels[k], level))
+            if len(self.placed_containers_levels[h]) == 0 and type(self.occupancy_map) is type(shipment.occupancy_map):
+                self.occupancy_map.set_level(h, shipment.occupancy_map, k)
+                self.free_rectangles[h] = None if shipment.free_rectangles[k] is None \
+                    else shipment.free_rectangles[k].copy()
+                self.largest_empty_lengths[h] = shipment.largest_empty_lengths[k]
+                self.largest_empty_bounds[h] = shipment.largest_empty_bounds[k]
+            else:
+                for placed_container in level:
+                    self._add_to_map(placed_container, self.occupancy_map)
+                self.free_rectangles[h] = None
+                self._outdate_largest_empty_lengths(h)
+            self.extreme_points[h] = None
+            self.placed_containers_levels[h].extend(level)
+            self.occupied_areas[h] += shipment.occupied_areas[k]
+        if first_level + levels_nr < self.levels_nr:
+            self.extreme_points[first_level + levels_nr] = None
+
+        self.all_containers.update(shipment.all_containers)
+        for old, new in shifted.items():
+            self.placed_containers_index[new.container.cid] = new
+            self.supports[new] = {shifted[x]: area for x, area in shipment.supports[old].items()}
+            self.supported_by[new] = {shifted[x]: area for x, area in shipment.supported_by[old].items()}
+        if 0 < first_level < self.levels_nr:
+            self._link_levels(first_level - 1)
+        self.first_fit_cursors = {}
+        self.version += 1
+
+    def _link_levels(self, height_level):
+        """
+        Private method.
+        Add links to the support graph between all overlapping containers on a given level and on the level above.
+        Overlap areas of all pairs are computed at once.
+        :param height_level: a height level
+        :return:
+        """
+        below = self.placed_containers_levels[height_level]
+        above = self.placed_containers_levels[height_level + 1]
+        if len(below) == 0 or len(above) == 0:
+            return
+        b, a = self._get_rectangles(below), self._get_rectangles(above)
+        lengths = np.minimum(b[:, None, 1], a[None, :, 1]) - np.maximum(b[:, None, 0], a[None, :, 0])
+        widths = np.minimum(b[:, None, 3], a[None, :, 3]) - np.maximum(b[:, None, 2], a[None, :, 2])
+        for i, j in np.argwhere((lengths > 0) & (widths > 0)):
+            area = int(lengths[i, j] * widths[i, j])
+            self.supports[below[i]][above[j]] = area
+            self.supported_by[above[j]][below[i]] = area
 
     def _get_supported_containers(self, placed_container):
         """
         Return list of containers supported by a given container (list of containers which would be unstable if a given
-        container was removed).
+        container was removed). Only containers linked with it in the support graph are checked.
         :param placed_container: a placed container
         :return: list of containers
         """
-        if placed_container.corner1.height_level >= self.levels_nr - 1:
-            return []
-        else:
-            above_containers = self.placed_containers_levels[placed_container.corner1.height_level + 1]
-            if len(above_containers) == 0:
-                return []
-            map_to_be = np.copy(self.occupancy_map)
-            self._remove_from_map(placed_container, map_to_be)
-            return [x for x in above_containers if not self._check_if_stable(x, checked_map=map_to_be)]
+        return [above for above, area in self.supports[placed_container].items()
+                if sum(self.supported_by[above].values()) - area < (above.container.length * above.container.width) / 2]
 
     def check_and_remove(self, placed_container):
         """
@@ -323,7 +922,7 @@ class Shipment:
         :param placed_container: a placed container to remove
         :return: True if successfully removed, else False
         """
-        if placed_container not in self.placed_containers_levels[placed_container.corner1.height_level]:
+        if self.placed_containers_index.get(placed_container.container.cid) is not placed_container:
             if_can = False
         else:
             if_can = len(self._get_supported_containers(placed_container)) == 0
@@ -1,8 +1,10 @@
+import numpy as np
 from optimizer_module.corner_position_file import CornerPosition
 from optimizer_module.placed_container_file import PlacedContainer
 from containers_module.container_file import Container
 from ships_module.ship_file import Ship
 from optimizer_module.shipment_file import Shipment
+from optimizer_module.greedy_optimizer_file import GreedyOptimizer
 
 
 def test_check_and_add():
@@ -171,3 +173,493 @@ def test_remove_recursively():
     rmr1 = sh.remove_recursively(pc01)
 
     assert rmr1
+
+
+def test_contains_and_order():
+    """ On a 5x5 ship with 2 levels c3, c1 and c2 2x2 are added in this order, c2 on top of c1. Containers are
+        returned in order of adding, also after a redundant add of c1 is rejected. After removing c2 and c3 and
+        adding them again, they follow c1. Removing c1 recursively removes c2 on top of it as well. """
+
+    s1 = Ship(sid=1, length=5, width=5, height=20, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    c1, c2, c3, c4 = [Container(cid=i, length=2, width=2, height=10, timestamp=39) for i in range(1, 5)]
+    pc3 = PlacedContainer(container=c3, corner1=CornerPosition(height_level=0, length=3, width=3))
+    pc1 = PlacedContainer(container=c1, corner1=CornerPosition(height_level=0, length=0, width=0))
+    pc2 = PlacedContainer(container=c2, corner1=CornerPosition(height_level=1, length=0, width=0))
+    assert sh.check_and_add(pc3)
+    assert sh.check_and_add(pc1)
+    assert sh.check_and_add(pc2)
+    assert not sh.check_and_add(PlacedContainer(container=c1, corner1=CornerPosition(height_level=0, length=3,
+                                                                                     width=0)))
+    assert [x.cid for x in sh.get_all_containers()] == [3, 1, 2]
+    assert sh.contains(c1) and sh.contains(c2) and sh.contains(c3)
+    assert not sh.contains(c4)
+
+    assert sh.check_and_remove(pc2)
+    assert sh.check_and_remove(pc3)
+    assert [x.cid for x in sh.get_all_containers()] == [1]
+    assert not sh.contains(c2) and not sh.contains(c3)
+    assert sh.check_and_add(pc3)
+    assert sh.check_and_add(pc2)
+    assert [x.cid for x in sh.get_all_containers()] == [1, 3, 2]
+
+    assert sh.remove_recursively(pc1)
+    assert [x.cid for x in sh.get_all_containers()] == [3]
+    assert not sh.contains(c1) and not sh.contains(c2)
+    assert list(sh.placed_containers_index) == [3]
+
+
+def test_summed_area_table():
+    """ We add 3 containers and remove one of them. After every change the summed area table has to be equal to
+        prefix sums of the occupancy map, so the checks based on it give the same results as np.sum over the map. """
+
+    s1 = Ship(sid=1, length=5, width=4, height=20, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    c01 = Container(cid=1, length=2, width=3, height=10, timestamp=39)
+    c02 = Container(cid=2, length=3, width=1, height=10, timestamp=39)
+    c03 = Container(cid=3, length=2, width=2, height=10, timestamp=39)
+    pc01 = PlacedContainer(container=c01, corner1=CornerPosition(height_level=0, length=0, width=1))
+    pc02 = PlacedContainer(container=c02, corner1=CornerPosition(height_level=0, length=2, width=0))
+    pc03 = PlacedContainer(container=c03, corner1=CornerPosition(height_level=1, length=0, width=2))
+
+    def check_table():
+        for level in range(sh.levels_nr):
+            expected = np.zeros(shape=(s1.length + 1, s1.width + 1), dtype=np.int32)
+            expected[1:, 1:] = np.cumsum(np.cumsum(sh.occupancy_map[level], axis=0), axis=1)
+            assert np.array_equal(sh.occupancy_map.summed_area_table[level], expected)
+
+    assert sh.check_and_add(pc01)
+    check_table()
+    assert sh.check_and_add(pc02)
+    check_table()
+    assert sh.check_and_add(pc03)
+    check_table()
+    assert sh.occupancy_map.get_occupied_area(0, 0, 5, 0, 4) == 9
+    assert sh.occupancy_map.get_occupied_area(0, 1, 3, 0, 2) == 2
+    assert sh.check_and_remove(pc02)
+    check_table()
+    assert sh.occupancy_map.get_occupied_area(0, 0, 5, 0, 4) == 6
+
+
+def test_get_feasible_positions():
+    """ We have ship 4x4 with 2 height_levels and container c01 2x2 on height_level=0 on length=0, width=0.
+        For a container 2x2 on height_level=0 the mask must be equal to results of check_and_add at every position.
+        On height_level=1 a container 2x2 is stable only if at least 2 cells below are occupied, so only positions
+        (0, 0), (0, 1) and (1, 0) are feasible. A container 5x1 does not fit into the ship at all. """
+
+    s1 = Ship(sid=1, length=4, width=4, height=20, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    c01 = Container(cid=1, length=2, width=2, height=10, timestamp=39)
+    sh.check_and_add(PlacedContainer(container=c01, corner1=CornerPosition(height_level=0, length=0, width=0)))
+
+    mask = sh.get_feasible_positions(length=2, width=2, height_level=0)
+    for l in range(4):
+        for w in range(4):
+            c = Container(cid=100 + 4 * l + w, length=2, width=2, height=10, timestamp=39)
+            pc = PlacedContainer(container=c, corner1=CornerPosition(height_level=0, length=l, width=w))
+            if_can = sh.check_and_add(pc)
+            if if_can:
+                sh.check_and_remove(pc)
+            assert mask[l, w] == if_can
+
+    mask = sh.get_feasible_positions(length=2, width=2, height_level=1)
+    assert np.array_equal(np.argwhere(mask), [[0, 0], [0, 1], [1, 0]])
+    assert sh.get_feasible_positions(length=2, width=2).shape == (2, 4, 4)
+    assert not sh.get_feasible_positions(length=5, width=1).any()
+
+
+def test_get_occupied_volume():
+    """ Occupied volume and used levels are counted incrementally. We check them after adding containers, joining
+        another shipment and removing a container, comparing with values computed from the occupancy map. """
+
+    s1 = Ship(sid=1, length=5, width=5, height=30, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    sh2 = Shipment(s1, containers_height=10)
+    c01 = Container(cid=1, length=2, width=3, height=10, timestamp=39)
+    c02 = Container(cid=2, length=2, width=2, height=10, timestamp=39)
+    c03 = Container(cid=3, length=2, width=2, height=10, timestamp=39)
+    pc01 = PlacedContainer(container=c01, corner1=CornerPosition(height_level=0, length=0, width=0))
+    pc02 = PlacedContainer(container=c02, corner1=CornerPosition(height_level=1, length=0, width=0))
+    pc03 = PlacedContainer(container=c03, corner1=CornerPosition(height_level=0, length=0, width=0))
+    sh.check_and_add(pc01)
+    sh.check_and_add(pc02)
+    sh2.check_and_add(pc03)
+
+    assert sh.get_occupied_volume() == np.sum(sh.occupancy_map.to_array()) * 10 == 100
+    assert sh.get_used_levels_nr() == 2
+    assert sh.check_and_join(sh2)
+    assert sh.get_occupied_volume() == np.sum(sh.occupancy_map.to_array()) * 10 == 140
+    assert sh.get_used_levels_nr() == 3
+    assert sh.get_empty_volume() == 750 - 140
+    sh.remove_recursively(sh.placed_containers_levels[1][0])
+    assert sh.get_occupied_volume() == np.sum(sh.occupancy_map.to_array()) * 10 == 60
+    assert sh.get_used_levels_nr() == 1
+    assert sh.copy().get_occupied_volume() == 60
+
+
+def test_get_free_rectangles():
+    """ Free rectangles of a level are updated when a container is added and rebuilt when a container is removed.
+        Copies of the shipment have independent free rectangles. """
+
+    s1 = Ship(sid=1, length=4, width=4, height=20, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    c01 = Container(cid=1, length=2, width=2, height=10, timestamp=39)
+    c02 = Container(cid=2, length=4, width=1, height=10, timestamp=39)
+    pc01 = PlacedContainer(container=c01, corner1=CornerPosition(height_level=0, length=0, width=0))
+    pc02 = PlacedContainer(container=c02, corner1=CornerPosition(height_level=0, length=0, width=3))
+
+    assert sh.get_free_rectangles(0).rectangles == [(0, 4, 0, 4)]
+    sh.check_and_add(pc01)
+    sh_copy = sh.copy()
+    sh.check_and_add(pc02)
+    assert set(sh.get_free_rectangles(0).rectangles) == {(2, 4, 0, 3), (0, 4, 2, 3)}
+    assert set(sh_copy.get_free_rectangles(0).rectangles) == {(2, 4, 0, 4), (0, 4, 2, 4)}
+    sh.check_and_remove(pc01)
+    assert sh.get_free_rectangles(0).rectangles == [(0, 4, 0, 3)]
+
+
+def test_get_extreme_points():
+    """ We have ship 5x5 with 2 height_levels. c01 2x3 is on height_level=0 on length=0, width=0 and c02 1x1 is on
+        height_level=0 on length=3, width=4. Extreme points of c01 are (2, 0) and (0, 3). An extreme point of c02 at
+        its far width edge is outside the ship, the one at its far length edge is projected toward width 0 up to
+        the ship side, so it is (4, 0). The origin is covered by c01, so it is dropped. On height_level=1 extreme
+        points are lower corners of c01 and c02, unless they are occupied by c03 1x1 placed there. """
+
+    s1 = Ship(sid=1, length=5, width=5, height=20, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    c01 = Container(cid=1, length=2, width=3, height=10, timestamp=39)
+    c02 = Container(cid=2, length=1, width=1, height=10, timestamp=39)
+    pc01 = PlacedContainer(container=c01, corner1=CornerPosition(height_level=0, length=0, width=0))
+    pc02 = PlacedContainer(container=c02, corner1=CornerPosition(height_level=0, length=3, width=4))
+
+    assert sh.get_extreme_points(0) == {(0, 0)}
+    sh.check_and_add(pc01)
+    sh.check_and_add(pc02)
+    assert sh.get_extreme_points(0) == {(2, 0), (0, 3), (4, 0)}
+    assert sh.get_extreme_points(1) == {(0, 0), (3, 4)}
+    sh.check_and_remove(pc02)
+    assert sh.get_extreme_points(0) == {(2, 0), (0, 3)}
+    assert sh.get_extreme_points(1) == {(0, 0)}
+    assert sh.place(Container(cid=3, length=1, width=1, height=10, timestamp=39), 1, 0, 0)
+    assert sh.get_extreme_points(1) == {(1, 0), (0, 1)}
+    sh.check_and_add(pc02)
+    assert sh.get_extreme_points(1) == {(1, 0), (0, 1), (3, 4)}
+    sh.extreme_points = [None, None]
+    assert sh.get_extreme_points(0) == {(2, 0), (0, 3), (4, 0)}
+    assert sh.get_extreme_points(1) == {(1, 0), (0, 1), (3, 4)}
+
+
+def test_can_place_and_place():
+    """ The same situations as in test_check_and_add, but containers are placed using raw positions.
+        can_place must not change the shipment and place must create a placed container only if it succeeds. """
+
+    s1 = Ship(sid=1, length=5, width=5, height=20, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    c1 = Container(cid=1, length=2, width=2, height=10, timestamp=39)
+    c2 = Container(cid=2, length=2, width=2, height=10, timestamp=39)
+
+    assert sh.can_place(c1, height_level=0, length=0, width=0)
+    assert len(sh.get_all_containers()) == 0
+    assert sh.place(c1, height_level=0, length=0, width=0)
+    assert not sh.place(c2, height_level=0, length=0, width=0)
+    assert not sh.place(c2, height_level=1, length=2, width=2)
+    assert not sh.place(c2, height_level=0, length=4, width=4)
+    assert not sh.place(c2, height_level=2, length=0, width=0)
+    assert not sh.place(c1, height_level=0, length=3, width=3)
+    assert sh.place(c2, height_level=1, length=1, width=0)
+    assert sh.placed_containers_levels[1][0].corner2.length == 3
+    assert sh.get_all_containers() == [c1, c2]
+
+
+def test_support_graph():
+    """ c01 2x2 and c03 2x2 are on height_level=0 on (0, 0) and (0, 2). c02 2x4 is on height_level=1 on (0, 0) and rests
+        on both of them with overlap area 4. c04 1x1 is added on height_level=0 later under nothing.
+        Removing c01 is possible (c02 keeps half of its area supported), then removing c03 is not. """
+
+    s1 = Ship(sid=1, length=5, width=5, height=20, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    c01 = Container(cid=1, length=2, width=2, height=10, timestamp=39)
+    c02 = Container(cid=2, length=2, width=4, height=10, timestamp=39)
+    c03 = Container(cid=3, length=2, width=2, height=10, timestamp=39)
+    c04 = Container(cid=4, length=1, width=1, height=10, timestamp=39)
+    pc01 = PlacedContainer(container=c01, corner1=CornerPosition(height_level=0, length=0, width=0))
+    pc02 = PlacedContainer(container=c02, corner1=CornerPosition(height_level=1, length=0, width=0))
+    pc03 = PlacedContainer(container=c03, corner1=CornerPosition(height_level=0, length=0, width=2))
+    pc04 = PlacedContainer(container=c04, corner1=CornerPosition(height_level=0, length=4, width=4))
+    sh.check_and_add(pc01)
+    sh.check_and_add(pc03)
+    sh.check_and_add(pc02)
+    sh.check_and_add(pc04)
+
+    assert sh.supported_by[pc02] == {pc01: 4, pc03: 4}
+    assert sh.supports[pc01] == {pc02: 4}
+    assert sh.supports[pc04] == {}
+    assert sh.check_and_remove(pc01)
+    assert sh.supported_by[pc02] == {pc03: 4}
+    assert not sh.check_and_remove(pc03)
+    assert sh.copy().supports[pc03] == {pc02: 4}
+
+
+def test_copy_on_write():
+    """ We add c01 and copy the shipment. The copy shares levels of the occupancy map until one of the shipments
+        modifies them. Then we add c02 on c01 and c03 to the original and remove c02 from the copy. Containers,
+        the occupancy map, volumes and support graphs of both shipments are independent. """
+
+    s1 = Ship(sid=1, length=5, width=5, height=20, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    c01 = Container(cid=1, length=2, width=2, height=10, timestamp=39)
+    c02 = Container(cid=2, length=2, width=2, height=10, timestamp=39)
+    c03 = Container(cid=3, length=3, width=3, height=10, timestamp=39)
+    pc01 = PlacedContainer(container=c01, corner1=CornerPosition(height_level=0, length=0, width=0))
+    pc02 = PlacedContainer(container=c02, corner1=CornerPosition(height_level=1, length=0, width=0))
+    pc03 = PlacedContainer(container=c03, corner1=CornerPosition(height_level=0, length=2, width=2))
+
+    assert sh.check_and_add(pc01)
+    assert sh.check_and_add(pc02)
+    sh_copy = sh.copy()
+    assert sh_copy.occupancy_map.occupancy[0] is sh.occupancy_map.occupancy[0]
+    assert sh.check_and_add(pc03)
+    assert sh_copy.occupancy_map.occupancy[0] is not sh.occupancy_map.occupancy[0]
+    assert sh_copy.occupancy_map.occupancy[1] is sh.occupancy_map.occupancy[1]
+    assert sh_copy.check_and_remove(pc02)
+
+    assert sh.get_all_containers() == [c01, c02, c03]
+    assert sh.get_occupied_volume() == np.sum(sh.occupancy_map.to_array()) * 10 == 170
+    assert sh.supports[pc01] == {pc02: 4}
+    assert sh_copy.get_all_containers() == [c01]
+    assert sh_copy.get_occupied_volume() == np.sum(sh_copy.occupancy_map.to_array()) * 10 == 40
+    assert sh_copy.supports[pc01] == {}
+    assert sh_copy.check_and_add(pc03)
+
+
+def test_check_and_join_levels():
+    """ sh1 has c11 2x2 at (0, 0) on level 0. sh2 has c21 2x2 at (3, 3) on level 0, which would not be supported
+        on the top of sh1, so joining fails. sh3 has c31 2x2 at (0, 0) on level 0 and c32 1x1 on it on level 1.
+        After joining sh3 to sh1 containers of sh3 are on levels 1 and 2, the occupancy map, the index and
+        the support graph are updated, and sh3 is not changed when sh1 is modified. """
+
+    s1 = Ship(sid=1, length=5, width=5, height=30, timestamp=39)
+    c11 = Container(cid=11, length=2, width=2, height=10, timestamp=39)
+    c21 = Container(cid=21, length=2, width=2, height=10, timestamp=39)
+    c31 = Container(cid=31, length=2, width=2, height=10, timestamp=39)
+    c32 = Container(cid=32, length=1, width=1, height=10, timestamp=39)
+    sh1 = Shipment(s1, containers_height=10)
+    sh1.check_and_add(PlacedContainer(container=c11, corner1=CornerPosition(height_level=0, length=0, width=0)))
+    sh2 = Shipment(s1, containers_height=10)
+    sh2.check_and_add(PlacedContainer(container=c21, corner1=CornerPosition(height_level=0, length=3, width=3)))
+    sh3 = Shipment(s1, containers_height=10)
+    sh3.check_and_add(PlacedContainer(container=c31, corner1=CornerPosition(height_level=0, length=0, width=0)))
+    sh3.check_and_add(PlacedContainer(container=c32, corner1=CornerPosition(height_level=1, length=0, width=0)))
+
+    assert not sh1.check_and_join(sh2)
+    assert sh1.check_and_join(sh3)
+    assert sh1.get_used_levels_nr() == 3
+    assert sh1.get_occupied_volume() == np.sum(sh1.occupancy_map.to_array()) * 10 == 90
+    pc11, pc31, pc32 = (sh1.placed_containers_index[x] for x in (11, 31, 32))
+    assert pc31.corner1.height_level == 1 and pc32.corner1.height_level == 2
+    assert sh1.supports[pc11] == {pc31: 4}
+    assert sh1.supports[pc31] == {pc32: 1}
+    assert sh1.supported_by[pc31] == {pc11: 4}
+    assert sh1.check_and_add(PlacedContainer(container=c21, corner1=CornerPosition(height_level=0, length=3, width=3)))
+    assert np.sum(sh1.occupancy_map.to_array()) == 13
+    assert np.sum(sh3.occupancy_map.to_array()) == 5
+
+
+def test_join_empty_shipment():
+    """ sh1 has c1 1x1 on each of its 3 levels, so all levels are used. Joining an empty shipment succeeds
+        and does not change sh1. """
+
+    s1 = Ship(sid=1, length=5, width=5, height=30, timestamp=39)
+    sh1 = Shipment(s1, containers_height=10)
+    for h in range(3):
+        container = Container(cid=h, length=1, width=1, height=10, timestamp=39)
+        assert sh1.check_and_add(PlacedContainer(container=container,
+                                                 corner1=CornerPosition(height_level=h, length=0, width=0)))
+    version = sh1.version
+    assert sh1.check_and_join(Shipment(s1, containers_height=10))
+    assert sh1.get_used_levels_nr() == 3
+    assert len(sh1.get_all_containers()) == 3
+    assert sh1.version == version
+
+
+def test_find_first_position():
+    """ Containers with a few footprints are placed in first positions and sometimes removed. After every change
+        first positions found with cached cursors are the same as first True values of feasibility masks in all
+        orders: (height level, length, width), (width, height level, length) and on a single level. """
+
+    s1 = Ship(sid=1, length=9, width=7, height=30, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    footprints = [(2, 3), (3, 2), (1, 1), (4, 4), (2, 3)]
+    placed = []
+    for i in range(60):
+        length, width = footprints[i % len(footprints)]
+        if i % 7 == 6 and len(placed) > 0:
+            sh.check_and_remove(placed.pop(i % len(placed)))
+        for height_level, by_width in [(None, False), (None, True), (1, False), (2, True)]:
+            feasible = sh.get_feasible_positions(length, width, height_level)
+            if height_level is None and by_width:
+                feasible = feasible.transpose((2, 0, 1))
+            elif by_width:
+                feasible = feasible.T
+            position = sh.find_first_position(length, width, height_level, by_width)
+            if not feasible.any():
+                assert position is None
+                continue
+            coordinates = [int(x) for x in np.unravel_index(np.argmax(feasible), feasible.shape)]
+            if height_level is None:
+                expected = (coordinates[1], coordinates[2], coordinates[0]) if by_width else tuple(coordinates)
+            else:
+                expected = (height_level, coordinates[1], coordinates[0]) if by_width else (height_level, *coordinates)
+            assert position == expected
+        position = sh.find_first_position(length, width)
+        if position is not None:
+            container = Container(cid=i, length=length, width=width, height=10, timestamp=39)
+            assert sh.place(container, *position)
+            placed.append(sh.placed_containers_index[i])
+
+
+def test_unfit_footprints():
+    """ A 5x5 level is filled with c01 4x5 at (0, 0). Then footprint 2x1 has no empty place on level 0 and footprints
+        dominating it are rejected without scanning, but 1x3 is not. After c01 is removed, 2x1 fits again. """
+
+    s1 = Ship(sid=1, length=5, width=5, height=20, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    c01 = Container(cid=1, length=4, width=5, height=10, timestamp=39)
+    assert sh.place(c01, 0, 0, 0)
+
+    assert sh.find_first_position(2, 1, height_level=0) is None
+    assert sh.unfit_footprints[0] == [(2, 1)]
+    assert sh.dominance_rejections_nr == 0
+    assert sh.find_first_position(3, 2, height_level=0) is None
+    assert sh.find_first_position(2, 1) == (1, 0, 0)
+    assert sh.dominance_rejections_nr == 2
+    assert sh.find_first_position(1, 3, height_level=0) == (0, 4, 0)
+    assert sh.unfit_footprints[0] == [(2, 1)]
+
+    sh.check_and_remove(sh.placed_containers_index[1])
+    assert sh.unfit_footprints[0] == []
+    assert sh.find_first_position(2, 1, height_level=0) == (0, 0, 0)
+
+
+def test_largest_empty_lengths():
+    """ Containers are added to a 6x5 level. Longest empty rectangles of every width are compared with a brute force
+        search; the summary is rebuilt on a query after every addition and removal. A footprint which is longer
+        than the summary allows is rejected without scanning, also by the outdated summary after a next addition,
+        which is not rebuilt by the check. A footprint larger than the free area is rejected even if no summary
+        has been built. Then random 1x1 containers are added to a 7x9 level with every backend and the summary is compared
+        with a brute force search after every addition. """
+
+    def brute_force(level_map):
+        lengths = []
+        for width in range(1, level_map.shape[1] + 1):
+            longest = max([length for length in range(1, level_map.shape[0] + 1)
+                           for l in range(level_map.shape[0] - length + 1)
+                           for w in range(level_map.shape[1] - width + 1)
+                           if not level_map[l:l + length, w:w + width].any()] + [0])
+            if longest == 0:
+                break
+            lengths.append(longest)
+        return lengths
+
+    s1 = Ship(sid=1, length=6, width=5, height=20, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    assert list(sh.get_largest_empty_lengths(0)) == [6, 6, 6, 6, 6]
+    for cid, (length, width, l, w) in enumerate([(2, 2, 0, 1), (1, 3, 4, 2), (2, 1, 2, 4)]):
+        assert sh.place(Container(cid=cid, length=length, width=width, height=10, timestamp=39), 0, l, w)
+    assert list(sh.get_largest_empty_lengths(0)) == brute_force(sh.occupancy_map[0]) == [6, 4, 2, 2, 1]
+
+    assert not sh.check_if_may_fit(3, 3, 0)
+    assert sh.find_first_position(3, 3, height_level=0) is None
+    assert sh.rectangle_rejections_nr == 1
+    assert sh.find_first_position(2, 4, height_level=0) == (0, 2, 0)
+    assert sh.place(Container(cid=3, length=1, width=1, height=10, timestamp=39), 0, 5, 0)
+    assert sh.largest_empty_lengths[0] is None
+    assert not sh.check_if_may_fit(3, 3, 0)
+    assert sh.largest_empty_lengths[0] is None
+    assert sh.check_if_may_fit(2, 4, 0)
+    assert sh.largest_empty_lengths[0] is None
+    sh.check_and_remove(sh.placed_containers_index[3])
+
+    sh.check_and_remove(sh.placed_containers_index[2])
+    assert list(sh.get_largest_empty_lengths(0)) == brute_force(sh.occupancy_map[0]) == [6, 4, 2, 2, 2]
+
+    sh = Shipment(s1, containers_height=10)
+    assert sh.place(Container(cid=1, length=5, width=5, height=10, timestamp=39), 0, 0, 0)
+    assert not sh.check_if_may_fit(2, 3, 0)
+    assert sh.check_if_may_fit(1, 5, 0)
+    assert sh.largest_empty_lengths[0] is None
+
+    s2 = Ship(sid=2, length=7, width=9, height=20, timestamp=39)
+    for occupancy_map_type in ["dense", "bitpacked", "sparse"]:
+        sh = Shipment(s2, containers_height=10, occupancy_map_type=occupancy_map_type)
+        for cid in range(40):
+            sh.place(Container(cid=cid, length=1, width=1, height=10, timestamp=39), 0, (cid * 5) % 7, (cid * 4) % 9)
+            assert list(sh.get_largest_empty_lengths(0)) == brute_force(sh.occupancy_map[0])
+
+
+def test_version_and_failed_placements():
+    """ The version of a shipment increases on every addition, removal and load. A failed placement is remembered
+        only until the shipment is modified. """
+
+    s1 = Ship(sid=1, length=5, width=5, height=20, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    c01 = Container(cid=1, length=2, width=2, height=10, timestamp=39)
+    placement = ("first_fit", 6, 1, None, False)
+
+    sh.add_failed_placement(placement)
+    assert sh.check_failed_placement(placement)
+    assert not sh.check_failed_placement(("first_fit", 1, 6, None, False))
+    assert sh.place(c01, 0, 0, 0)
+    assert sh.version == 1
+    assert not sh.check_failed_placement(placement)
+    sh.add_failed_placement(placement)
+    sh_copy = sh.copy()
+    assert sh_copy.version == 1
+    assert not sh_copy.check_failed_placement(placement)
+    sh.check_and_remove(sh.placed_containers_index[1])
+    assert sh.version == 2
+    assert not sh.check_failed_placement(placement)
+
+
+def test_rotation():
+    """ Container c01 2x6 does not fit a 10x4 ship unless it is rotated by 90 degrees. With rotation it is placed
+        at (0, 0) as a 6x2 footprint. Then c02 3x4 fits at (6, 0) in both orientations and the unrotated one
+        is preferred. Both orientations are searched in one scan of levels: a 2x3 footprint which fits only
+        on level 1 is placed rotated on level 0 and level 1 is not scanned. Optimizers place containers rotated only
+        if rotation is enabled. """
+
+    s1 = Ship(sid=1, length=10, width=4, height=20, timestamp=39)
+    c01 = Container(cid=1, length=2, width=6, height=10, timestamp=39)
+    c02 = Container(cid=2, length=3, width=4, height=10, timestamp=39)
+    sh = Shipment(s1, containers_height=10)
+    assert sh.find_first_placement(c01.length, c01.width) is None
+    assert sh.find_first_placement(c01.length, c01.width, rotation=True) == (0, 0, 0, True)
+    assert not sh.can_place(c01, 0, 0, 0)
+    assert sh.place(c01, 0, 0, 0, rotated=True)
+    placed_container = sh.placed_containers_index[1]
+    assert placed_container.rotated
+    assert (placed_container.length, placed_container.width) == (6, 2)
+    assert (placed_container.corner2.length, placed_container.corner2.width) == (6, 2)
+    assert sh.occupancy_map.get_occupied_area(0, 0, 10, 0, 4) == 12
+    assert sh.find_first_placement(c02.length, c02.width, rotation=True) == (0, 6, 0, False)
+
+    sh4 = Shipment(s1, containers_height=10)
+    assert sh4.place(c01, 0, 0, 0, rotated=True)
+    assert sh4.place(Container(cid=3, length=4, width=2, height=10, timestamp=39), 0, 6, 0)
+    assert sh4.place(Container(cid=4, length=2, width=2, height=10, timestamp=39), 1, 0, 0)
+    assert sh4.find_first_placement(2, 3, rotation=True) == (0, 0, 2, True)
+    assert sh4.first_fit_cursors[(2, 3, None, False)] == 9 * 2
+    assert sh4.find_first_placement(2, 3) == (1, 2, 0, False)
+
+    sh2 = Shipment(s1, containers_height=10)
+    assert sh2.check_and_add(PlacedContainer(c01, CornerPosition(length=0, width=0, height_level=0), rotated=True))
+    assert not sh2.check_and_add(PlacedContainer(c02, CornerPosition(length=5, width=0, height_level=0)))
+
+    for placement_strategy in ["first_fit", "free_rectangles", "extreme_points"]:
+        assert not GreedyOptimizer(placement_strategy=placement_strategy).place_container(Shipment(s1, 10), c01)
+        sh3 = Shipment(s1, 10)
+        optimizer = GreedyOptimizer(placement_strategy=placement_strategy, rotation=True)
+        assert optimizer.place_container(sh3, c01)
+        assert optimizer.place_container(sh3, c02)
+        assert sh3.placed_containers_index[1].rotated
+        assert not sh3.placed_containers_index[2].rotated
@@ -17,6 +17,7 @@ class ShipmentsManager:
         """
         self.main_timestamp = main_timestamp    # main timestamp for the shipments
         self.shipments = []                     # list of shipments
+        self.containers_ids = set()             # set of ids of containers in all shipments
 
     def __str__(self):
         """
@@ -80,9 +81,8 @@ class ShipmentsManager:
         :return: True if there is no redundancy, else False
         """
         if_ok = True
-        loaded_containers = self.get_containers()
         for container in shipment.get_all_containers():
-            if container in loaded_containers:
+            if container.cid in self.containers_ids:
                 if_ok = False
                 break
         return if_ok
@@ -101,6 +101,7 @@ class ShipmentsManager:
             if_can = self._check_shipment_timestamps(shipment) and self._check_redundancy(shipment)
         if if_can:
             self.shipments.append(shipment)
+            self.containers_ids.update(container.cid for container in shipment.get_all_containers())
         return if_can
 
     def check_and_remove(self, shipment):
@@ -119,6 +120,7 @@ class ShipmentsManager:
                 if_can = True
         if if_can:
             self.shipments.remove(shipment)
+            self.containers_ids.difference_update(container.cid for container in shipment.get_all_containers())
         return if_can
 
 
@@ -89,6 +89,38 @@ def test_get_containers():
     __eq__(cons_c[1], cons[1])
 
 
+def test_containers_ids():
+    """ Ids of containers of added shipments are kept in sync: sh0 with c01 and sh1 with c11 and c12 are added,
+        sh2 with c12 is rejected as redundant and does not change ids. Removing sh1 removes its ids, so sh2 can be
+        added then. Removing the first shipment sh0 is rejected and keeps its ids. """
+
+    s0 = Ship(sid=1, length=5, width=5, height=20, timestamp=39)
+    c01, c11, c12 = [Container(cid=cid, length=2, width=2, height=10, timestamp=39) for cid in [1, 11, 12]]
+    sh0 = Shipment(s0, containers_height=10)
+    sh0.check_and_add(PlacedContainer(container=c01, corner1=CornerPosition(height_level=0, length=0, width=0)))
+    sh1 = Shipment(s0, containers_height=10)
+    sh1.check_and_add(PlacedContainer(container=c11, corner1=CornerPosition(height_level=0, length=0, width=0)))
+    sh1.check_and_add(PlacedContainer(container=c12, corner1=CornerPosition(height_level=0, length=2, width=2)))
+    sh2 = Shipment(s0, containers_height=10)
+    sh2.check_and_add(PlacedContainer(container=c12, corner1=CornerPosition(height_level=0, length=0, width=0)))
+
+    shm = ShipmentsManager(main_timestamp=39)
+    assert shm.containers_ids == set()
+    assert shm.check_and_add(sh0)
+    assert shm.check_and_add(sh1)
+    assert shm.containers_ids == {1, 11, 12}
+    assert not shm.check_and_add(sh2)
+    assert shm.containers_ids == {1, 11, 12}
+
+    assert shm.check_and_remove(sh1)
+    assert shm.containers_ids == {1}
+    assert shm.check_and_add(sh2)
+    assert shm.containers_ids == {1, 12}
+    assert not shm.check_and_remove(sh0)
+    assert shm.containers_ids == {1, 12}
+    assert shm.containers_ids == {x.cid for x in shm.get_containers()}
+
+
 def test_check_and_remove():
     """ We have 3 sh sh0 with c01 2x2 on height_level =0 on length=0, width=0; - shipment correct
                   sh1 with c11 2x2 on height_level =0 on length=3, width=0; - shipment correct
@@ -0,0 +1,123 @@
+import numpy as np
+
+
+class SolutionValidator:
+    """
+    Class used for validating finished solutions (shipments managers) in bulk, without replaying check_and_add()
+    container by container. A solution is valid if
+        - every container is inside its ship,
+        - containers do not overlap,
+        - every container above the lowest level has at least a half of its area supported,
+        - no container is placed twice,
+        - timestamps are correct (see ShipmentsManager._check_shipment_timestamps()).
+    Levels of a shipment are rebuilt at once: corners of containers are accumulated in a difference array
+    with np.add.at and prefix sums give a number of containers and a label (an index of a container) of every cell.
+    Support of all containers is counted with a single np.bincount over labels of cells occupied on the level below.
+    """
+    @staticmethod
+    def _get_placed_containers_arrays(shipment):
+        """
+        Private method.
+        Get data of all placed containers of a shipment as arrays.
+        :param shipment: a shipment
+        :return: a tuple (list of placed containers, array of ids, array with rows
+                 (height level, length1, length2, width1, width2), array of areas, array of timestamps)
+        """
+        placed_containers = [x for level in shipment.placed_containers_levels for x in level]
+        cids = np.array([x.container.cid for x in placed_containers], dtype=np.int64)
+        rectangles = np.array([(x.corner1.height_level, x.corner1.length, x.corner2.length,
+                                x.corner1.width, x.corner2.width) for x in placed_containers],
+                              dtype=np.int64).reshape(-1, 5)
+        areas = np.array([x.container.length * x.container.width for x in placed_containers], dtype=np.int64)
+        timestamps = np.array([x.container.timestamp for x in placed_containers], dtype=np.int64)
+        return placed_containers, cids, rectangles, areas, timestamps
+
+    @staticmethod
+    def _accumulate(shape, rectangles, values):
+        """
+        Private method.
+        Add given values on given rectangles of levels. Every rectangle adds its value to 4 corners of a difference
+        array, then prefix sums over the length and the width axis spread it over the rectangle.
+        :param shape: a shape of levels (levels number, length, width)
+        :param rectangles: an array with rows (height level, length1, length2, width1, width2)
+        :param values: an array of values of rectangles
+        :return: an array with a given shape
+        """
+        diff = np.zeros(shape=(shape[0], shape[1] + 1, shape[2] + 1), dtype=np.int64)
+        h, l1, l2, w1, w2 = rectangles.T
+        np.add.at(diff, (h, l1, w1), values)
+        np.add.at(diff, (h, l1, w2), -values)
+        np.add.at(diff, (h, l2, w1), -values)
+        np.add.at(diff, (h, l2, w2), values)
+        return diff.cumsum(axis=1).cumsum(axis=2)[:, :-1, :-1]
+
+    @staticmethod
+    def get_shipment_errors(shipment):
+        """
+        Get descriptions of all physical errors of a single shipment: containers outside the ship, overlapping
+        containers and unstable containers. Timestamps and duplicates between shipments are not checked.
+        :param shipment: a shipment
+        :return: a list of strings describing errors (empty if the shipment is valid)
+        """
+        errors = []
+        placed_containers, cids, rectangles, areas, _ = SolutionValidator._get_placed_containers_arrays(shipment)
+        if len(placed_containers) == 0:
+            return errors
+        shape = (shipment.levels_nr, shipment.ship.length, shipment.ship.width)
+        h, l1, l2, w1, w2 = rectangles.T
+        inside = (0 <= h) & (h < shape[0]) & (0 <= l1) & (l1 < l2) & (l2 <= shape[1]) & \
+                 (0 <= w1) & (w1 < w2) & (w2 <= shape[2])
+        errors += [f"Container c{x} is outside the ship" for x in cids[~inside]]
+        rectangles = rectangles[inside]
+        areas = areas[inside]
+        cids = cids[inside]
+
+        counts = SolutionValidator._accumulate(shape, rectangles, np.ones(len(rectangles), dtype=np.int64))
+        if counts.max(initial=0) > 1:
+            levels = np.flatnonzero((counts > 1).any(axis=(1, 2)))
+            errors += [f"Containers overlap on level {x}" for x in levels]
+            return errors
+
+        labels = SolutionValidator._accumulate(shape, rectangles, np.arange(1, len(rectangles) + 1))
+        supported_areas = np.bincount(labels[1:][counts[:-1] > 0], minlength=len(rectangles) + 1)[1:]
+        unstable = (rectangles[:, 0] > 0) & (supported_areas < areas / 2)
+        errors += [f"Container c{x} is not stable" for x in cids[unstable]]
+        return errors
+
+    @staticmethod
+    def get_errors(shipments_manager):
+        """
+        Get descriptions of all errors of a solution.
+        :param shipments_manager: a shipments manager
+        :return: a list of strings describing errors (empty if the solution is valid)
+        """
+        errors = []
+        all_cids = []
+        for i, shipment in enumerate(shipments_manager.shipments):
+            errors += [f"Shipment {i}: {x}" for x in SolutionValidator.get_shipment_errors(shipment)]
+            _, cids, _, _, timestamps = SolutionValidator._get_placed_containers_arrays(shipment)
+            all_cids.append(cids)
+            if len(timestamps) == 0:
+                continue
+            if i == 0:
+                wrong = timestamps > shipments_manager.main_timestamp
+            else:
+                wrong = timestamps != shipments_manager.main_timestamp
+            errors += [f"Shipment {i}: Container c{x} has an incorrect timestamp" for x in cids[wrong]]
+
+        cids, counts = np.unique(np.concatenate(all_cids + [np.zeros(0, dtype=np.int64)]), return_counts=True)
+        errors += [f"Container c{x} is placed {y} times" for x, y in zip(cids[counts > 1], counts[counts > 1])]
+        return errors
+
+    @staticmethod
+    def validate(shipments_manager):
+        """
+        Check if a solution is valid.
+        :param shipments_manager: a shipments manager
+        :return: True if the solution is valid, else False
+        """
+        return len(SolutionValidator.get_errors(shipments_manager)) == 0
+
+
+if __name__ == "__main__":
+    pass
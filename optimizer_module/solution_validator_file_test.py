@@ -0,0 +1,71 @@
+from containers_module.container_file import Container
+from ships_module.ship_file import Ship
+from optimizer_module.corner_position_file import CornerPosition
+from optimizer_module.placed_container_file import PlacedContainer
+from optimizer_module.shipment_file import Shipment
+from optimizer_module.shipments_manager_file import ShipmentsManager
+from optimizer_module.greedy_optimizer_file import GreedyOptimizer
+from optimizer_module.solution_validator_file import SolutionValidator
+
+
+def insert(shipment, container, height_level, length, width, rotated=False):
+    """ Put a container into a shipment without any checks (like a buggy optimizer would do). """
+
+    placed_container = PlacedContainer(container, CornerPosition(length=length, width=width,
+                                                                 height_level=height_level), rotated)
+    shipment.placed_containers_levels[height_level].append(placed_container)
+    shipment.all_containers[container.cid] = container
+
+
+def test_valid_solution():
+    """ Solutions found by the greedy optimizer (also with rotation) are valid. """
+
+    ships = [Ship(sid=1, length=20, width=12, height=30, timestamp=0),
+             Ship(sid=2, length=15, width=15, height=20, timestamp=0)]
+    containers = [Container(cid=i, length=1 + i % 7, width=2 + i % 5, height=10, timestamp=1)
+                  for i in range(120)]
+    for optimizer in [GreedyOptimizer(), GreedyOptimizer(rotation=True)]:
+        shipments_manager = optimizer.optimize(ships, containers, timestamp=1, container_height=10,
+                                               previous_shipment=None)
+        assert SolutionValidator.get_errors(shipments_manager) == []
+        assert SolutionValidator.validate(shipments_manager)
+
+
+def test_invalid_solution():
+    """ On a 5x5 ship c01 4x2 is at level 0 (0, 0) and c02 2x4 rotated at level 1 (1, 0) is supported by 6 of 8 cells.
+        Then c03 overlaps c01, c04 is supported by less than a half, c05 sticks out of the ship, c06 has
+        a timestamp greater than the main timestamp and c01 is placed again in the second shipment. """
+
+    s1 = Ship(sid=1, length=5, width=5, height=30, timestamp=39)
+    c01 = Container(cid=1, length=4, width=2, height=10, timestamp=39)
+    c02 = Container(cid=2, length=2, width=4, height=10, timestamp=39)
+    c03 = Container(cid=3, length=1, width=1, height=10, timestamp=39)
+    c04 = Container(cid=4, length=2, width=2, height=10, timestamp=39)
+    c05 = Container(cid=5, length=2, width=2, height=10, timestamp=39)
+    c06 = Container(cid=6, length=1, width=1, height=10, timestamp=40)
+
+    sh1 = Shipment(s1, containers_height=10)
+    insert(sh1, c01, 0, 0, 0)
+    insert(sh1, c02, 1, 1, 0, rotated=True)
+    shm = ShipmentsManager(main_timestamp=39)
+    shm.shipments.append(sh1)
+    assert SolutionValidator.get_shipment_errors(sh1) == []
+    assert SolutionValidator.validate(shm)
+
+    insert(sh1, c04, 2, 3, 2)
+    assert SolutionValidator.get_shipment_errors(sh1) == ["Container c4 is not stable"]
+    insert(sh1, c05, 0, 4, 4)
+    assert SolutionValidator.get_shipment_errors(sh1) == ["Container c5 is outside the ship",
+                                                          "Container c4 is not stable"]
+    insert(sh1, c03, 0, 3, 1)
+    assert SolutionValidator.get_shipment_errors(sh1) == ["Container c5 is outside the ship",
+                                                          "Containers overlap on level 0"]
+
+    sh2 = Shipment(s1, containers_height=10)
+    insert(sh2, c01, 0, 0, 0)
+    insert(sh2, c06, 0, 4, 4)
+    shm.shipments.append(sh2)
+    errors = SolutionValidator.get_errors(shm)
+    assert "Shipment 1: Container c6 has an incorrect timestamp" in errors
+    assert "Container c1 is placed 2 times" in errors
+    assert not SolutionValidator.validate(shm)
@@ -269,11 +269,13 @@ class ReportGenerator:
         filename = f'shipment_{self.shipments_list.index(shipment)}.json'
         data = {'ship': str(shipment.ship),
                 'containers': [],
-                'corners': []}
+                'corners': [],
+                'rotations': []}
         for level in shipment.placed_containers_levels:
             for placed_container in level:
                 data['containers'].append(str(placed_container.container))
                 data['corners'].append(str(placed_container.corner1.to_str_with_real_dimensions(const_height=placed_container.container.height)))
+                data['rotations'].append(placed_container.rotated)
         with open(os.path.join(self.dirname, filename), 'w') as f:
             json.dump(data, f, indent=4)
 
@@ -341,16 +343,17 @@ class ReportGenerator:
             w2 = pl_cont.corner2.width * scale
             l2 = pl_cont.corner2.length * scale
             cv2.rectangle(img, (w1, l1), (w2, l2), used_lines_color, line_width)
-            if pl_cont.container.width > 5 and pl_cont.container.length > 5:
+            if pl_cont.width > 5 and pl_cont.length > 5:
                 font_size = 2.0
                 thickness = 4
-            elif pl_cont.container.width > 2 and pl_cont.container.length > 2:
+            elif pl_cont.width > 2 and pl_cont.length > 2:
                 font_size = 1.0
                 thickness = 2
             else:
                 font_size = 0.5
                 thickness = 1
-            cv2.putText(img, f"c{pl_cont.container.cid}", (w1 + line_width, l2 - line_width),
+            label = f"c{pl_cont.container.cid}" + ("r" if pl_cont.rotated else "")
+            cv2.putText(img, label, (w1 + line_width, l2 - line_width),
                         font, font_size, used_lines_color, thickness, cv2.LINE_AA)
 
         shift_margin = int(margin_value / 2)
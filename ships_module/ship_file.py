@@ -2,6 +2,8 @@ class Ship:
     """
     Class used for storing a single ship.
     """
+    __slots__ = ("sid", "length", "width", "height", "timestamp")
+
     def __init__(self, sid, length, width, height, timestamp=None):
         """
         Constructor.
@@ -4,18 +4,29 @@ from containers_module.containers_manager_file import ContainersManager
 from ships_module.ships_manager_file import ShipsManager
 from report_generator_module.report_generator_file import ReportGenerator
 from optimizer_module.optimizer_selector_file import OptimizerSelector
+from optimizer_module.grid_scaler_file import GridScaler
 
 
 class Operator:
     """
     Class used for managing the whole system.
     """
-    def __init__(self, optimizer_algorithm_file="optimizer_algorithm.txt"):
+    def __init__(self, optimizer_algorithm_file="optimizer_algorithm.txt", **args):
         """
         Constructor.
         :param optimizer_algorithm_file: a path to file with optimizer algorithm number
+        :param args: an optional dictionary used for changing default settings of the optimizer,
+                     eg. occupancy_map_type="bitpacked";
+                     compress_grid=True makes optimizers work on a grid scaled down by the greatest common divisor
+                     of all lengths and widths (see GridScaler);
+                     ships_manager_args and containers_manager_args are dictionaries of settings passed
+                     to the ships manager and the containers manager, eg. ships_manager_args={"max_length": 5000}
         """
         self.optimizer_algorithm_file = optimizer_algorithm_file    # a path to file with optimizer algorithm number
+        self.compress_grid = args.pop("compress_grid", False)       # (bool) if optimize on a compressed grid
+        self.ships_manager_args = args.pop("ships_manager_args", {})              # settings of the ships manager
+        self.containers_manager_args = args.pop("containers_manager_args", {})    # settings of the containers manager
+        self.optimizer_args = args                                  # settings of the optimizer
 
         self.report_generator = None        # a report generator
         self.timestamps_manager = None      # a timestamps manager
@@ -72,35 +83,45 @@ class Operator:
         max_timestamp = self.timestamps_manager.get_max()
         self.report_generator.start_optimization()
 
+        # without compression the factor is 1 and the scaler returns given objects
+        grid_scaler = GridScaler(self.ships_manager.ships if self.compress_grid else [],
+                                 self.containers_manager.waiting_containers if self.compress_grid else [])
+        if grid_scaler.factor > 1:
+            self.report_generator.log(f"Optimization on a grid compressed {grid_scaler.factor} times.")
+
         uncompleted_shipment = None
         while True:
             containers = self.containers_manager.get_containers(max_timestamp=max_timestamp)
             if len(containers) > 0:
                 self.timestamps_manager.set_min(min([c.timestamp for c in containers]))
                 ships = self.ships_manager.get_available(max_timestamp=self.timestamps_manager.get_min())
-                shipment_manager = self.optimizer.optimize(ships, containers,
+                shipment_manager = self.optimizer.optimize(grid_scaler.scale_ships(ships),
+                                                           grid_scaler.scale_containers(containers),
                                                            timestamp=max_timestamp,
                                                            container_height=self.containers_manager.const_h,
                                                            previous_shipment=uncompleted_shipment)
 
-                completed_shipments = shipment_manager.shipments[0:-1]
+                completed_shipments = grid_scaler.unscale_shipments(shipment_manager.shipments[0:-1])
                 uncompleted_shipment = shipment_manager.shipments[-1]
-                containers_to_send = shipment_manager.get_containers(skip_last_shipment=True)
+                containers_to_send = grid_scaler.unscale_containers(
+                    shipment_manager.get_containers(skip_last_shipment=True))
                 self.containers_manager.send(containers_to_send)
                 self.report_generator.send_containers(timestamp=max_timestamp,
                                                       available_ships=ships,
                                                       completed_shipments=completed_shipments,
-                                                      uncompleted_shipment=uncompleted_shipment)
+                                                      uncompleted_shipment=grid_scaler.unscale_shipment(
+                                                          uncompleted_shipment))
 
                 next_timestamp = self.timestamps_manager.increase_max()
                 if next_timestamp > -1:
                     max_timestamp = next_timestamp
                 else:
-                    containers_to_send = uncompleted_shipment.get_all_containers()
+                    containers_to_send = grid_scaler.unscale_containers(uncompleted_shipment.get_all_containers())
                     self.containers_manager.send(containers_to_send)
                     self.report_generator.send_containers(timestamp=max_timestamp,
                                                           available_ships=ships,
-                                                          completed_shipments=[uncompleted_shipment],
+                                                          completed_shipments=[grid_scaler.unscale_shipment(
+                                                              uncompleted_shipment)],
                                                           uncompleted_shipment=None)
                     break
             else:
@@ -121,10 +142,10 @@ class Operator:
         log_dir = f"{os.path.splitext(os.path.basename(input_file))[0]}_opt_{str(optimizer_algorithm_nr)}"
         with ReportGenerator(log_dir) as self.report_generator:
             self.timestamps_manager = TimestampsManager()
-            self.ships_manager = ShipsManager()
-            self.containers_manager = ContainersManager()
+            self.ships_manager = ShipsManager(**self.ships_manager_args)
+            self.containers_manager = ContainersManager(**self.containers_manager_args)
 
-            self.optimizer = OptimizerSelector.select(optimizer_algorithm_nr)
+            self.optimizer = OptimizerSelector.select(optimizer_algorithm_nr, **self.optimizer_args)
             self.optimizer.report_generator = self.report_generator
             self.report_generator.start(self.ships_manager, self.containers_manager, self.optimizer)
 
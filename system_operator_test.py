@@ -0,0 +1,25 @@
+from system_operator import Operator
+from ships_module.ships_manager_file import ShipsManager
+from containers_module.containers_manager_file import ContainersManager
+
+
+def test_manager_limits(tmp_path, monkeypatch):
+    """ A 200 x 150 ship and 60 x 50 containers are rejected by default limits of managers. Given limits through
+        the operator, they are entered and all containers are sent on a sparse occupancy map. """
+
+    input_file = tmp_path / "input_big.txt"
+    input_file.write_text("s0,150,60,200\n" + "".join(f"c{i},50,30,60,1\n" for i in range(12)))
+    monkeypatch.chdir(tmp_path)
+
+    operator = Operator(optimizer_algorithm_file=str(tmp_path / "optimizer_algorithm.txt"),
+                        ships_manager_args={"max_length": 200, "max_width": 200},
+                        containers_manager_args={"max_length": 60, "max_width": 60},
+                        occupancy_map_type="sparse")
+    operator.run(input_file=str(input_file), optimizer_algorithm=2)
+    assert len(operator.ships_manager.ships) == 1
+    assert len(operator.containers_manager.sent_containers) == 12
+    assert operator.containers_manager.waiting_containers == []
+
+    operator = Operator(optimizer_algorithm_file=str(tmp_path / "optimizer_algorithm.txt"))
+    assert ShipsManager(**operator.ships_manager_args).add("s0,150,60,200", added_timestamp=0) is None
+    assert ContainersManager(**operator.containers_manager_args).add("c0,50,30,60,1", min_timestamp=0) is None